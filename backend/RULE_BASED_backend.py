@@ -1,29 +1,151 @@
 import json
+import os
 import re
 import random
 from collections import Counter
+from functools import lru_cache
+
+# Patterns and lookup tables are built once at import and shared by every call
 
 # --- TRANSLATION SECTION ---
 
-# Load the translation dictionary once
-with open('translation_dict.json', 'r', encoding='utf-8') as f:
-    translation_dict = json.load(f)
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+DICT_PATH = os.path.join(MODULE_DIR, 'translation_dict.json')
+INDEX_PATH = os.path.join(MODULE_DIR, 'translation_dict.idx')
+INDEX_VERSION = 1
+
+# Stripped from word edges before lookup; apostrophes and hyphens are part of words (aujourd'hui, lui-même)
+PUNCTUATION = '.,;:!?()[]{}<>«»"“”…/*'
+
+def normalize(text):
+    return text.lower().replace('\u2019', "'")
+
+def build_translation_index(dictionary):
+    # Flat phrase table keyed by whitespace-normalized entries, plus the longest entry in words
+    phrases = {' '.join(normalize(phrase).split()): ' '.join(str(translation).split())
+               for phrase, translation in dictionary.items()}
+    max_phrase_words = max((len(phrase.split()) for phrase in phrases), default=1)
+    return phrases, max_phrase_words
+
+def write_translation_index(path, stamp, phrases, max_phrase_words):
+    # Header line, then the sorted phrases and their translations as two newline-separated arrays
+    keys = sorted(phrases)
+    header = ' '.join(str(value) for value in stamp + (max_phrase_words,))
+    body = '\n'.join(keys) + '\0' + '\n'.join(phrases[key] for key in keys)
+    with open(path, 'wb') as f:
+        f.write(f"{header}\n{body}".encode('utf-8'))
+
+def read_translation_index(path, stamp):
+    with open(path, 'rb') as f:
+        header, body = f.read().decode('utf-8').split('\n', 1)
+    *saved_stamp, max_phrase_words = (int(value) for value in header.split())
+    if tuple(saved_stamp) != stamp:
+        return None
+    keys, translations = body.split('\0')
+    return dict(zip(keys.split('\n'), translations.split('\n'))), max_phrase_words
+
+def load_translation_index():
+    # The index is cached next to the JSON and rebuilt whenever the JSON changes
+    stat = os.stat(DICT_PATH)
+    stamp = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+    try:
+        index = read_translation_index(INDEX_PATH, stamp)
+        if index is not None:
+            return index
+    except (OSError, ValueError):
+        pass
+
+    with open(DICT_PATH, 'r', encoding='utf-8') as f:
+        phrases, max_phrase_words = build_translation_index(json.load(f))
+    tmp_path = f"{INDEX_PATH}.{os.getpid()}.tmp"
+    try:
+        write_translation_index(tmp_path, stamp, phrases, max_phrase_words)
+        os.replace(tmp_path, INDEX_PATH)
+    except OSError:
+        pass
+    return phrases, max_phrase_words
+
+# Load the translation index once
+translation_phrases, max_phrase_words = load_translation_index()
+
+# Elided forms and the word they stand for, the full word is what the dictionary knows
+ELISIONS = {
+    'l': 'le', 'd': 'de', 'qu': 'que', 's': 'se', 'n': 'ne', 'j': 'je', 'm': 'me', 't': 'te', 'c': 'ce',
+    'jusqu': 'jusque', 'lorsqu': 'lorsque', 'puisqu': 'puisque', 'quelqu': 'quelque'
+}
+
+def lookup_word(word):
+    translation = translation_phrases.get(word)
+    if translation is not None:
+        return translation
+    # Elided articles and pronouns (l'homme, d'un) become two words; if the prefix has no translation the
+    # word is left whole rather than mixing French and English
+    if "'" in word:
+        prefix, rest = word.split("'", 1)
+        prefix_translation = translation_phrases.get(ELISIONS.get(prefix, ''))
+        if rest and prefix_translation is not None:
+            return f"{prefix_translation} {lookup_word(rest)}"
+    return word
+
+@lru_cache(maxsize=65536)
+def translate_word(chunk):
+    core = chunk.strip(PUNCTUATION)
+    if not core:
+        return chunk
+    if core == chunk:
+        return lookup_word(chunk)
+    # Punctuation stays attached where it was in the source
+    start = len(chunk) - len(chunk.lstrip(PUNCTUATION))
+    return chunk[:start] + lookup_word(core) + chunk[start + len(core):]
+
+def match_phrase(chunks, i):
+    # Longest multi-word entry starting at chunk i, punctuation on its edges is kept
+    for size in range(min(max_phrase_words, len(chunks) - i), 1, -1):
+        phrase = ' '.join(chunks[i:i + size])
+        core = phrase.strip(PUNCTUATION)
+        translation = translation_phrases.get(core)
+        if translation is not None:
+            start = len(phrase) - len(phrase.lstrip(PUNCTUATION))
+            return size, phrase[:start] + translation + phrase[start + len(core):]
+    return 1, None
 
 def translate_paragraph_simple(french_paragraph):
-    words = french_paragraph.lower().split()
-    translated_words = [translation_dict.get(word, word) for word in words]
-    return ' '.join(translated_words)
+    # One left-to-right pass; single words take the exact-match fast path
+    chunks = normalize(french_paragraph).split()
+    if max_phrase_words == 1:
+        return ' '.join([translation_phrases.get(chunk) or translate_word(chunk) for chunk in chunks])
+    translated = []
+    i = 0
+    while i < len(chunks):
+        size, text = match_phrase(chunks, i) if max_phrase_words > 1 else (1, None)
+        if text is None:
+            chunk = chunks[i]
+            text = translation_phrases.get(chunk) or translate_word(chunk)
+        translated.append(text)
+        i += size
+    return ' '.join(translated)
 
 def translate(paragraph):
     paragraphs = paragraph.strip().split('\n')
     translated_paragraphs = [translate_paragraph_simple(p) for p in paragraphs]
     return '\n'.join(translated_paragraphs)
 
+def translate_pages(pages):
+    return [translate(page) for page in pages]
+
 
 # --- SUMMARIZATION SECTION ---
 
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+WORD = re.compile(r'\b\w+\b')
+STOPWORDS = frozenset([
+    'the', 'a', 'an', 'and', 'is', 'was', 'are', 'were', 'of', 'to', 'in',
+    'on', 'at', 'by', 'with', 'for', 'as', 'from', 'that', 'this', 'it',
+    'but', 'be', 'have', 'has', 'had', 'i', 'you', 'he', 'she', 'they', 'we'
+])
+
 def summarize(paragraph):
-    sentences = re.split(r'(?<=[.!?])\s+', paragraph.strip())
+    sentences = SENTENCE_SPLIT.split(paragraph.strip())
     if len(sentences) <= 2:
         return paragraph.strip()
 
@@ -31,20 +153,14 @@ def summarize(paragraph):
     last = sentences[-1]
     middle_sentences = sentences[1:-1]
 
-    words = re.findall(r'\b\w+\b', paragraph.lower())
-
-    stopwords = set([
-        'the', 'a', 'an', 'and', 'is', 'was', 'are', 'were', 'of', 'to', 'in',
-        'on', 'at', 'by', 'with', 'for', 'as', 'from', 'that', 'this', 'it',
-        'but', 'be', 'have', 'has', 'had', 'i', 'you', 'he', 'she', 'they', 'we'
-    ])
-    content_words = [w for w in words if w not in stopwords]
+    # Words never span the whitespace sentences are split on, so each sentence is tokenized once
+    sentence_words = [WORD.findall(sent.lower()) for sent in sentences]
+    content_words = [w for words in sentence_words for w in words if w not in STOPWORDS]
     common_words = set(w for w, _ in Counter(content_words).most_common(5))
 
     scored_middle = []
-    for sent in middle_sentences:
-        sent_words = set(re.findall(r'\b\w+\b', sent.lower()))
-        score = len(sent_words & common_words)
+    for sent, words in zip(middle_sentences, sentence_words[1:-1]):
+        score = len(common_words.intersection(words))
         scored_middle.append((score, sent))
 
     scored_middle.sort(reverse=True)
@@ -54,19 +170,29 @@ def summarize(paragraph):
     summary = [first] + selected_middle + [last]
     return ' '.join(summary)
 
+def summarize_pages(pages):
+    return [summarize(page) for page in pages]
+
 
 # --- QUIZIFY SECTION ---
 
+LEADING_PHRASES = (
+    'suddenly', 'nearby', 'later', 'then', 'afterward', 'however', 'moreover', 'therefore',
+    'meanwhile', 'consequently', 'first', 'second', 'third', 'finally', 'next', 'in addition',
+    'besides', 'furthermore', 'hence', 'thus', 'accordingly', 'nonetheless', 'still', 'otherwise',
+    'alternatively', 'subsequently', 'eventually', 'overall', 'additionally', 'incidentally',
+    'as', 'since'
+)
+LEADING_PHRASE_PATTERN = re.compile(
+    r'^(?:' + '|'.join(re.escape(phrase) for phrase in LEADING_PHRASES) + r')[, ]+\s*',
+    flags=re.IGNORECASE
+)
+AUXILIARIES = frozenset(['is', 'are', 'was', 'were', 'can', 'could', 'will', 'would', 'should', 'has', 'have', 'had', 'does', 'do', 'did'])
+THIRD_PERSON_SINGULAR = frozenset(['he', 'she', 'it'])
+QUIZ_SENTENCE_SPLIT = re.compile(r'[.!?]')
+
 def clean_leading_phrases(sentence):
-    leading_phrases = [
-        'suddenly', 'nearby', 'later', 'then', 'afterward', 'however', 'moreover', 'therefore',
-        'meanwhile', 'consequently', 'first', 'second', 'third', 'finally', 'next', 'in addition',
-        'besides', 'furthermore', 'hence', 'thus', 'accordingly', 'nonetheless', 'still', 'otherwise',
-        'alternatively', 'subsequently', 'eventually', 'overall', 'additionally', 'incidentally',
-        'as', 'since'
-    ]
-    pattern = r'^(?:' + '|'.join(re.escape(phrase) for phrase in leading_phrases) + r')[, ]+\s*'
-    return re.sub(pattern, '', sentence.strip(), flags=re.IGNORECASE)
+    return LEADING_PHRASE_PATTERN.sub('', sentence.strip())
 
 def make_interrogative(sentence):
     sentence = clean_leading_phrases(sentence)
@@ -74,10 +200,9 @@ def make_interrogative(sentence):
     if len(words) < 2:
         return sentence
 
-    auxiliaries = ['is', 'are', 'was', 'were', 'can', 'could', 'will', 'would', 'should', 'has', 'have', 'had', 'does', 'do', 'did']
     aux_index = -1
     for i in range(min(4, len(words))):
-        if words[i].lower() in auxiliaries:
+        if words[i].lower() in AUXILIARIES:
             aux_index = i
             break
 
@@ -95,12 +220,12 @@ def make_interrogative(sentence):
         return f"Did {subject} {base_verb} {' '.join(rest)}?".replace('  ', ' ').strip()
 
     subject = words[0].lower()
-    aux = 'Does' if subject in ['he', 'she', 'it'] else 'Do'
+    aux = 'Does' if subject in THIRD_PERSON_SINGULAR else 'Do'
     rest = words[1:]
     return f"{aux} {subject} {' '.join(rest)}?".replace('  ', ' ').strip()
 
 def quizify(paragraph, n=3):
-    sentences = [s.strip() for s in re.split(r'[.!?]', paragraph) if s.strip()]
+    sentences = [s.strip() for s in QUIZ_SENTENCE_SPLIT.split(paragraph) if s.strip()]
     sampled = random.sample(sentences, min(n, len(sentences)))
     qa_pairs = []
     for s in sampled:
@@ -108,3 +233,6 @@ def quizify(paragraph, n=3):
         answer = s  # original sentence as answer
         qa_pairs.append((question, answer))
     return qa_pairs
+
+def quizify_pages(pages, n=3):
+    return [quizify(page, n) for page in pages]
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from uploads import UPLOAD_TTL_SECONDS, cleanup_uploads
+
+# Bounded storage for downloadable files. Names are content-addressed so two uploads called notes.pdf never
+# overwrite each other, the folder is kept under a disk quota by TTL and LRU eviction, and a file evicted
+# from disk can be rebuilt from its manifest of cached page outputs when it is downloaded again
+DOWNLOADS_MAX_BYTES = int(os.environ.get("EDUAI_DOWNLOADS_MAX_MB", "1024")) * 1024 * 1024
+DOWNLOAD_TTL_SECONDS = float(os.environ.get("EDUAI_DOWNLOAD_TTL_HOURS", "24")) * 3600
+# Manifests are tiny, they outlive the files so an evicted download can still be regenerated
+MANIFEST_TTL_SECONDS = float(os.environ.get("EDUAI_MANIFEST_TTL_DAYS", "30")) * 86400
+CLEANUP_INTERVAL_SECONDS = int(os.environ.get("EDUAI_CLEANUP_INTERVAL_SECONDS", "300"))
+
+PARTIAL_PREFIX = ".partial-"
+
+class ArtifactStore:
+    def __init__(self, directory, db_path, regenerate=None, max_bytes=DOWNLOADS_MAX_BYTES,
+                 ttl=DOWNLOAD_TTL_SECONDS):
+        # regenerate(path, manifest) writes the file back from its manifest and returns False if it cannot
+        os.makedirs(directory, exist_ok=True)
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.directory = directory
+        self.regenerate = regenerate
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "name TEXT PRIMARY KEY, size INTEGER, present INTEGER, created REAL, last_used REAL, manifest TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS artifacts_last_used ON artifacts (last_used)")
+        self.db.commit()
+        self.evictions = 0
+        self.regenerations = 0
+        self.adopt_untracked()
+
+    def partial_path(self, extension):
+        # Exports are written under a temporary name until their content hash is known
+        return os.path.join(self.directory, f"{PARTIAL_PREFIX}{uuid.uuid4().hex}.{extension}")
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def adopt_untracked(self):
+        # Files written before the store existed count against the quota like any other download
+        with self.lock:
+            known = {row[0] for row in self.db.execute("SELECT name FROM artifacts")}
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name not in known and not entry.name.startswith(PARTIAL_PREFIX):
+                    stat = entry.stat()
+                    self.db.execute(
+                        "INSERT INTO artifacts (name, size, present, created, last_used, manifest) VALUES (?, ?, 1, ?, ?, NULL)",
+                        (entry.name, stat.st_size, stat.st_mtime, stat.st_mtime)
+                    )
+            self.db.commit()
+
+    def add(self, name, temp_path, manifest=None):
+        # Moves a finished file into place, an identical file already stored under the same name is kept
+        final_path = self.path(name)
+        now = time.time()
+        with self.lock:
+            if os.path.exists(final_path):
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, final_path)
+            self.db.execute(
+                "INSERT OR REPLACE INTO artifacts (name, size, present, created, last_used, manifest) VALUES (?, ?, 1, ?, ?, ?)",
+                (name, os.path.getsize(final_path), now, now, json.dumps(manifest) if manifest else None)
+            )
+            self.evict(keep=name)
+            self.db.commit()
+        return final_path
+
+    def locate(self, name):
+        # Path of a stored file, regenerated first if it was evicted; None if it is unknown or cannot be rebuilt.
+        # Regeneration runs outside the lock so other downloads and exports are not held up behind it
+        final_path = self.path(name)
+        while True:
+            with self.lock:
+                row = self.db.execute("SELECT manifest FROM artifacts WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return None
+            temp_path = None
+            if not os.path.exists(final_path):
+                if not (row[0] and self.regenerate):
+                    return None
+                temp_path = self.partial_path(name.rsplit(".", 1)[-1])
+                try:
+                    regenerated = self.regenerate(temp_path, json.loads(row[0]))
+                except Exception as e:
+                    print(f"❌ Could not regenerate {name}:", e)
+                    regenerated = False
+                if not regenerated:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    return None
+            with self.lock:
+                if temp_path:
+                    # Another request may have rebuilt the same file meanwhile, the contents are identical
+                    if os.path.exists(final_path):
+                        os.remove(temp_path)
+                    else:
+                        os.replace(temp_path, final_path)
+                        self.regenerations += 1
+                        print(f"♻️ Regenerated evicted download {name}")
+                elif not os.path.exists(final_path):
+                    # Evicted between the check and the lock, go round again to rebuild it
+                    continue
+                self.db.execute("UPDATE artifacts SET size = ?, present = 1, last_used = ? WHERE name = ?",
+                                (os.path.getsize(final_path), time.time(), name))
+                self.evict(keep=name)
+                self.db.commit()
+            return final_path
+
+    def remove_file(self, name):
+        # A file that cannot be deleted (still open for download on Windows) stays present for a later sweep
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"❌ Could not evict {name}:", e)
+            return False
+        self.db.execute("UPDATE artifacts SET present = 0 WHERE name = ?", (name,))
+        self.evictions += 1
+        return True
+
+    def evict(self, keep=None):
+        # Expired files go first, then the least recently used until the folder fits its quota again.
+        # Rows without a manifest cannot be regenerated and are dropped together with their file
+        now = time.time()
+        for (name,) in self.db.execute(
+                "SELECT name FROM artifacts WHERE present = 1 AND last_used < ?", (now - self.ttl,)).fetchall():
+            if name != keep:
+                self.remove_file(name)
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts WHERE present = 1").fetchone()[0]
+        if total > self.max_bytes:
+            for name, size in self.db.execute(
+                    "SELECT name, size FROM artifacts WHERE present = 1 ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                if name != keep and self.remove_file(name):
+                    total -= size
+        self.db.execute("DELETE FROM artifacts WHERE present = 0 AND (manifest IS NULL OR last_used < ?)",
+                        (now - MANIFEST_TTL_SECONDS,))
+
+    def cleanup(self):
+        # Called periodically: eviction plus partial files left behind by interrupted exports
+        with self.lock:
+            self.evict()
+            self.db.commit()
+        cutoff = time.time() - UPLOAD_TTL_SECONDS
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(PARTIAL_PREFIX):
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self.lock:
+            files, size = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts WHERE present = 1").fetchone()
+            regenerable = self.db.execute(
+                "SELECT COUNT(*) FROM artifacts WHERE present = 0 AND manifest IS NOT NULL").fetchone()[0]
+            return {
+                "files": files,
+                "size_bytes": size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "evicted_regenerable": regenerable,
+                "evictions": self.evictions,
+                "regenerations": self.regenerations
+            }
+
+def start_cleanup(store, interval=CLEANUP_INTERVAL_SECONDS):
+    def loop():
+        while True:
+            try:
+                store.cleanup()
+                cleanup_uploads()
+            except Exception as e:
+                print("❌ Cleanup failed:", e)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="eduai-cleanup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,50 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import main
+from exporters import WRITERS, DEFAULT_FORMATS
+from render_profiles import RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+
+# Offline batch run: every PDF in a folder or zip archive, one output bundle per file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process a folder or zip archive of PDFs")
+    parser.add_argument("source", help="directory (searched recursively) or .zip archive of PDFs")
+    parser.add_argument("--actions", default="extract", help=f"comma-separated, from {main.allowed_actions}")
+    parser.add_argument("--method", choices=["ai", "rule"], default="ai")
+    parser.add_argument("--output", default="batch_output", help="directory that receives one folder per PDF")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help=f"comma-separated, from {list(WRITERS)}")
+    parser.add_argument("--render-profile", choices=list(RENDER_PROFILES), default=DEFAULT_RENDER_PROFILE)
+    parser.add_argument("--no-text-layer", action="store_true", help="OCR every page even if it has a text layer")
+    args = parser.parse_args()
+
+    actions = [a.strip() for a in args.actions.split(",") if a.strip()]
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = [a for a in actions if a not in main.allowed_actions] + [f for f in formats if f not in WRITERS]
+    if unknown:
+        sys.exit(f"❌ Unknown actions or formats: {unknown}")
+
+    main.start_services()
+    work_dir = tempfile.mkdtemp()
+    try:
+        pdfs = main.collect_pdfs(args.source, work_dir)
+        if not pdfs:
+            sys.exit(f"❌ No PDF files found in {args.source}")
+        print(f"Processing {len(pdfs)} PDF files: {', '.join(actions)} ({args.method})")
+        os.makedirs(args.output, exist_ok=True)
+
+        def progress(pages_done, total_pages):
+            print(f"\r{pages_done}/{total_pages} pages", end="", flush=True)
+
+        summary = main.run_batch(pdfs, actions, args.method, args.output, formats, not args.no_text_layer,
+                                 args.render_profile, progress)
+        print()
+        for entry in summary:
+            if entry["status"] == "done":
+                print(f"✅ {entry['file']} -> {os.path.join(args.output, entry['bundle'])}")
+            else:
+                print(f"❌ {entry['file']}: {entry['error']}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,28 @@
+import os
+import numpy as np
+
+# Pages handed to EasyOCR per readtext_batched call
+EASYOCR_BATCH_SIZE = int(os.environ.get("EDUAI_EASYOCR_BATCH_SIZE", "4"))
+
+def pixmap_to_array(pix):
+    # EasyOCR expects BGR arrays, the same layout it gets from cv2.imread
+    samples = np.frombuffer(pix.samples, dtype=np.uint8)
+    if pix.n == 1:
+        return samples.reshape(pix.height, pix.width).copy()
+    rgb = samples.reshape(pix.height, pix.width, pix.n)[:, :, :3]
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+def readtext_batch(reader, images, batch_size=EASYOCR_BATCH_SIZE):
+    results = reader.readtext_batched(images, detail=0, batch_size=batch_size)
+    return [" ".join(lines) for lines in results]
+
+def iter_easyocr_batched(reader, images, batch_size=EASYOCR_BATCH_SIZE):
+    # Batches only hold pages of one size, so detection runs without resizing
+    batch = []
+    for image in images:
+        if batch and (len(batch) >= batch_size or image.shape != batch[0].shape):
+            yield from readtext_batch(reader, batch, batch_size)
+            batch = []
+        batch.append(image)
+    if batch:
+        yield from readtext_batch(reader, batch, batch_size)
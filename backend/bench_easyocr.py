@@ -0,0 +1,58 @@
+import argparse
+import os
+import tempfile
+import time
+import fitz  # PyMuPDF
+import easyocr
+from batched_ocr import pixmap_to_array, iter_easyocr_batched
+
+# Compares today's per-page readtext loop with batched readtext_batched on CPU
+
+def render_pages(pdf_path, output_dir, max_pages):
+    doc = fitz.open(pdf_path)
+    paths = []
+    for i, page in enumerate(doc):
+        if i >= max_pages:
+            break
+        path = os.path.join(output_dir, f"page_{i}.png")
+        page.get_pixmap().save(path)
+        paths.append(path)
+    doc.close()
+    return paths
+
+def bench_per_page(pdf_path, output_dir, max_pages, reader):
+    # Today's loop: render to PNG on disk, then readtext each file
+    start = time.perf_counter()
+    image_paths = render_pages(pdf_path, output_dir, max_pages)
+    for path in image_paths:
+        " ".join(reader.readtext(str(path), detail=0))
+    return len(image_paths) / (time.perf_counter() - start)
+
+def bench_batched(reader, pdf_path, max_pages, batch_size):
+    # Rendering is timed here as well, since it replaces the PNG round-trip
+    start = time.perf_counter()
+    doc = fitz.open(pdf_path)
+    pages = [doc.load_page(i) for i in range(min(max_pages, len(doc)))]
+    images = (pixmap_to_array(page.get_pixmap()) for page in pages)
+    for _ in iter_easyocr_batched(reader, images, batch_size):
+        pass
+    doc.close()
+    return len(pages) / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EasyOCR per-page vs batched throughput")
+    parser.add_argument("pdf", nargs="?", default="MLintro1.pdf")
+    parser.add_argument("--pages", type=int, default=16)
+    parser.add_argument("--batch-sizes", default="2,4,8")
+    args = parser.parse_args()
+
+    reader = easyocr.Reader(['fr'], gpu=False)
+    with tempfile.TemporaryDirectory() as output_dir:
+        # Warm-up so model initialisation is not counted
+        warmup = render_pages(args.pdf, output_dir, 1)
+        reader.readtext(str(warmup[0]), detail=0)
+
+        print(f"{args.pages} pages max from {args.pdf}")
+        print(f"per-page loop: {bench_per_page(args.pdf, output_dir, args.pages, reader):.2f} pages/sec")
+        for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+            print(f"batched (batch_size={batch_size}): {bench_batched(reader, args.pdf, args.pages, batch_size):.2f} pages/sec")
@@ -0,0 +1,117 @@
+import argparse
+import copy
+import json
+import statistics
+import time
+from difflib import SequenceMatcher
+import torch
+import main
+from torch_tuning import configure_threads, quantize_model
+
+# Compares fp32 against dynamic int8 for translate, summarize and quiz on CPU
+
+SAMPLE_PAGES = [
+    "L'apprentissage automatique est un domaine de l'intelligence artificielle. Il permet aux ordinateurs "
+    "d'apprendre à partir de données sans être explicitement programmés.",
+    "Un réseau de neurones est composé de couches. Chaque couche transforme les données reçues de la couche "
+    "précédente. L'entraînement ajuste les poids pour réduire l'erreur sur les exemples.",
+    "La régression linéaire cherche la droite qui s'ajuste le mieux aux points. Elle est simple, rapide et "
+    "souvent utilisée comme point de départ avant des modèles plus complexes.",
+    "Les données doivent être séparées en un ensemble d'entraînement et un ensemble de test. Sinon, on ne peut "
+    "pas mesurer si le modèle généralise à des exemples qu'il n'a jamais vus.",
+]
+
+SAMPLE_PAGES_EN = [
+    "Machine learning is a field of artificial intelligence. It lets computers learn from data without being "
+    "explicitly programmed. Models are trained on examples and evaluated on data they have not seen before.",
+    "A neural network is made of layers. Each layer transforms the data it receives from the previous one. "
+    "Training adjusts the weights so that the error on the training examples goes down.",
+]
+
+def timed(fn, repeats):
+    latencies = []
+    outputs = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        outputs = fn()
+        latencies.append(time.perf_counter() - start)
+    return outputs, latencies
+
+def drift(baseline, candidate):
+    # 0 means identical outputs, 1 means nothing in common
+    ratios = [SequenceMatcher(None, str(a), str(b)).ratio() for a, b in zip(baseline, candidate)]
+    return round(1 - statistics.mean(ratios), 4)
+
+def seq2seq_task(model_info, texts, **generate_kwargs):
+    return lambda: main.batch_generate(model_info, texts, **generate_kwargs)
+
+def quiz_task(qg_info, qa_model, texts):
+    def run():
+        prompts = [f"generate questions: {text}" for text in texts]
+        # Greedy decoding so fp32 and int8 outputs can be compared
+        questions = main.batch_generate(qg_info, prompts, max_length=128)
+        with torch.inference_mode():
+            return [(q, qa_model(question=q, context=text)["answer"]) for q, text in zip(questions, texts)]
+    return run
+
+def quantized_seq2seq(model_info):
+    return {"tokenizer": model_info["tokenizer"], "model": quantize_model(copy.deepcopy(model_info["model"]))}
+
+def quantized_qa(qa_model):
+    quantized = copy.copy(qa_model)
+    quantized.model = quantize_model(copy.deepcopy(qa_model.model))
+    return quantized
+
+def report(name, texts, fp32_task, int8_task, repeats):
+    fp32_outputs, fp32_latencies = timed(fp32_task, repeats)
+    int8_outputs, int8_latencies = timed(int8_task, repeats)
+    result = {}
+    for label, latencies in (("fp32", fp32_latencies), ("int8", int8_latencies)):
+        result[label] = {
+            "latency_p50_s": round(statistics.median(latencies), 4),
+            "pages_per_sec": round(len(texts) / statistics.median(latencies), 3)
+        }
+    result["speedup"] = round(result["int8"]["pages_per_sec"] / result["fp32"]["pages_per_sec"], 2)
+    result["output_drift"] = drift(fp32_outputs, int8_outputs)
+    print(name, json.dumps(result))
+    return result
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="fp32 vs dynamic int8 inference benchmark")
+    parser.add_argument("--actions", default="translate,summarize,quiz")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--interop-threads", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    configure_threads(args.threads, args.interop_threads)
+    print(f"torch threads: {torch.get_num_threads()} intra-op, {torch.get_num_interop_threads()} inter-op")
+
+    results = {}
+    actions = args.actions.split(",")
+    if "translate" in actions:
+        info = main.model_registry.get("translation")
+        if info:
+            results["translate"] = report("translate", SAMPLE_PAGES,
+                                          seq2seq_task(info, SAMPLE_PAGES),
+                                          seq2seq_task(quantized_seq2seq(info), SAMPLE_PAGES), args.repeats)
+    if "summarize" in actions:
+        info = main.model_registry.get("summarization")
+        if info:
+            kwargs = {"max_length": 100, "min_length": 30, "length_penalty": 2.0}
+            results["summarize"] = report("summarize", SAMPLE_PAGES_EN,
+                                          seq2seq_task(info, SAMPLE_PAGES_EN, **kwargs),
+                                          seq2seq_task(quantized_seq2seq(info), SAMPLE_PAGES_EN, **kwargs), args.repeats)
+    if "quiz" in actions:
+        qg_info = main.model_registry.get("question_generation")
+        qa_model = main.model_registry.get("question_answering")
+        if qg_info and qa_model:
+            results["quiz"] = report("quiz", SAMPLE_PAGES_EN,
+                                     quiz_task(qg_info, qa_model, SAMPLE_PAGES_EN),
+                                     quiz_task(quantized_seq2seq(qg_info), quantized_qa(qa_model), SAMPLE_PAGES_EN),
+                                     args.repeats)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
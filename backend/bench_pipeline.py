@@ -0,0 +1,267 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+import fitz
+import torch
+from bench_rule_engine import FRENCH_SENTENCES, make_pages
+
+# End-to-end pipeline throughput per document, action and engine. Every case runs in its own
+# process so peak RSS is measured per case; stub models keep it offline and CPU-only by default
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_PDFS = ["MLintro1.pdf", "demo_en.pdf"]
+ACTIONS = ["extract", "translate", "summarize", "quiz"]
+ENGINES = ["rule", "ai"]
+STUB_OCR_TEXT = " ".join(FRENCH_SENTENCES[:4])
+stub_ocr_pages = itertools.count(1)
+
+def stub_ocr_text():
+    # Every page gets distinct text, otherwise the output cache would answer all pages after the first
+    return f"{STUB_OCR_TEXT} Page {next(stub_ocr_pages)}."
+
+# --- Stub models: same call signatures as the real ones, output echoes the input ---
+
+class StubEncoding(dict):
+    def to(self, device):
+        return self
+
+class StubTokenizer:
+    model_max_length = 512
+    pad_token_id = 0
+
+    def __init__(self):
+        self.words = ["<pad>"]
+        self.ids = {"<pad>": 0}
+
+    def encode(self, text, truncation=False):
+        ids = []
+        for word in text.split():
+            if word not in self.ids:
+                self.ids[word] = len(self.words)
+                self.words.append(word)
+            ids.append(self.ids[word])
+        return ids[:self.model_max_length] if truncation else ids
+
+    def __call__(self, texts, padding=False, truncation=False, return_tensors=None, add_special_tokens=True):
+        input_ids = [self.encode(text, truncation) for text in texts]
+        if return_tensors != "pt":
+            return StubEncoding(input_ids=input_ids)
+        width = max((len(ids) for ids in input_ids), default=0) or 1
+        mask = [[1] * len(ids) + [0] * (width - len(ids)) for ids in input_ids]
+        padded = [ids + [self.pad_token_id] * (width - len(ids)) for ids in input_ids]
+        return StubEncoding(input_ids=torch.tensor(padded), attention_mask=torch.tensor(mask))
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(self.words[int(i)] for i in ids if not (skip_special_tokens and int(i) == self.pad_token_id))
+
+    def batch_decode(self, sequences, skip_special_tokens=True):
+        return [self.decode(ids, skip_special_tokens) for ids in sequences]
+
+class StubSeq2SeqModel:
+    device = torch.device("cpu")
+    config = SimpleNamespace(max_position_embeddings=512)
+
+    def generate(self, input_ids, attention_mask=None, num_return_sequences=1, max_length=64, **generate_kwargs):
+        return input_ids[:, :max_length].repeat_interleave(num_return_sequences, dim=0)
+
+def stub_qa(question, context, batch_size=1):
+    return [{"answer": " ".join(text.split()[:8])} for text in context]
+
+class StubEasyOCRReader:
+    def readtext_batched(self, images, detail=0, batch_size=1):
+        return [[stub_ocr_text()] for _ in images]
+
+def stub_tesseract_ocr(images, binarize=False):
+    # Still pulls every image so rasterization and conversion are measured
+    for image in images:
+        yield stub_ocr_text()
+
+def install_stubs(main):
+    for name in ["translation", "question_generation", "summarization"]:
+        main.model_registry.register(name, lambda: {"tokenizer": StubTokenizer(), "model": StubSeq2SeqModel()})
+    main.model_registry.register("question_answering", lambda: stub_qa)
+    main.model_registry.register("easyocr", StubEasyOCRReader)
+    main.iter_tesseract_ocr = stub_tesseract_ocr
+
+# --- Synthetic documents ---
+
+def make_synthetic_pdf(path, num_pages, scanned=False, sentences_per_page=12):
+    # Scanned documents carry each page as an image only, so they go through rasterization and OCR
+    pdf = fitz.open()
+    for text in make_pages(num_pages, sentences_per_page, sentences=FRENCH_SENTENCES):
+        page = pdf.new_page()
+        page.insert_textbox(fitz.Rect(54, 54, 558, 738), text, fontsize=11)
+        if scanned:
+            pix = page.get_pixmap(dpi=100)
+            pdf.delete_page(-1)
+            pdf.new_page().insert_image(fitz.Rect(0, 0, 612, 792), pixmap=pix)
+    pdf.save(path)
+    pdf.close()
+    return path
+
+# --- One case, run in a child process ---
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+        except (ImportError, AttributeError):
+            return None
+
+def group_latencies(stamps, group_sizes):
+    # Pages of a group arrive together, so every page is charged the wall time of its whole group.
+    # stamps[0] is the start of the run, stamps[n] the moment page n was delivered
+    latencies = []
+    delivered = 0
+    for size in group_sizes:
+        seconds = stamps[delivered + size] - stamps[delivered]
+        latencies.extend([seconds] * size)
+        delivered += size
+    return latencies
+
+def run_case(pdf_path, action, engine, repeats, use_stubs):
+    os.chdir(BACKEND_DIR)
+    import main
+    from metrics import track_request
+    from result_cache import ResultCache
+    if use_stubs:
+        install_stubs(main)
+    # torch, transformers and EasyOCR are imported before anything is measured, as in a server that has finished
+    # starting, so the runs never overlap a background import and the import RSS is the same from run to run
+    main.heavy_imports.load_all()
+    baseline_rss = peak_rss_mb()
+
+    # Group sizes keyed by first page, recorded on the NLP thread and read back in page order
+    group_sizes = {}
+    process_page_group = main.process_page_group
+
+    def record_group(group, *args):
+        group_sizes[group[0]["page_num"]] = len(group)
+        return process_page_group(group, *args)
+
+    main.process_page_group = record_group
+
+    runs, latencies = [], []
+    for _ in range(repeats):
+        # A fresh cache per run, otherwise every run after the first only measures cache hits
+        main.result_cache = ResultCache(tempfile.mkdtemp(prefix="eduai-bench-cache-"))
+        stamps = []
+        group_sizes.clear()
+        with track_request() as timings:
+            start = time.perf_counter()
+            pages = main.run_pipeline(pdf_path, action, engine, lambda done, total: stamps.append(time.perf_counter()))
+            elapsed = time.perf_counter() - start
+        latencies.extend(group_latencies(stamps, [group_sizes[first] for first in sorted(group_sizes)]))
+        runs.append({"seconds": elapsed, "pages": len(pages),
+                     "first_page_seconds": stamps[1] - stamps[0] if len(stamps) > 1 else None,
+                     "stages": timings.as_dict()})
+
+    best = min(runs, key=lambda run: run["seconds"])
+    return {
+        "document": os.path.basename(pdf_path),
+        "action": action,
+        "engine": engine,
+        "pages": best["pages"],
+        "repeats": repeats,
+        "pages_per_sec": round(best["pages"] / best["seconds"], 2),
+        "median_seconds": round(statistics.median(run["seconds"] for run in runs), 4),
+        "first_page_seconds": round(best["first_page_seconds"], 4) if best["first_page_seconds"] is not None else None,
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        "import_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": best["stages"]
+    }
+
+# --- Driver ---
+
+def compare(previous_path, results):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(r["document"], r["action"], r["engine"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {previous_path}:")
+    for result in results:
+        old = previous.get((result["document"], result["action"], result["engine"]))
+        if old and old["pages_per_sec"]:
+            ratio = result["pages_per_sec"] / old["pages_per_sec"]
+            flag = "  ⚠️ regression" if ratio < 0.9 else ""
+            print(f"{result['document']:<28} {result['action']:<10} {result['engine']:<5} {ratio:6.2f}x{flag}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--pages", type=int, default=200, help="pages per synthetic document")
+    parser.add_argument("--actions", default=",".join(ACTIONS))
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--real-models", action="store_true", help="use the installed models and OCR engines")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="previous JSON results to compare pages/sec against")
+    parser.add_argument("--case", nargs=3, metavar=("PDF", "ACTION", "ENGINE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        pdf_path, action, engine = args.case
+        print(json.dumps(run_case(pdf_path, action, engine, args.repeats, not args.real_models)))
+        sys.exit(0)
+
+    work_dir = tempfile.mkdtemp(prefix="eduai-bench-")
+    documents = [os.path.join(BACKEND_DIR, name) for name in SAMPLE_PDFS]
+    documents.append(make_synthetic_pdf(os.path.join(work_dir, f"synthetic_text_{args.pages}.pdf"), args.pages))
+    documents.append(make_synthetic_pdf(os.path.join(work_dir, f"synthetic_scanned_{args.pages}.pdf"), args.pages,
+                                        scanned=True))
+
+    results = []
+    print(f"{'document':<28} {'action':<10} {'engine':<5} {'pages/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'RSS MB':>8}")
+    for document in documents:
+        for action in args.actions.split(","):
+            for engine in args.engines.split(","):
+                command = [sys.executable, os.path.abspath(__file__), "--case", document, action, engine,
+                           "--repeats", str(args.repeats)]
+                if args.real_models:
+                    command.append("--real-models")
+                completed = subprocess.run(command, capture_output=True, text=True, cwd=BACKEND_DIR)
+                if completed.returncode != 0:
+                    print(f"❌ {os.path.basename(document)} {action} {engine} failed:\n{completed.stderr[-2000:]}")
+                    continue
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"{result['document']:<28} {action:<10} {engine:<5} {result['pages_per_sec']:>9} "
+                      f"{result['latency_p50_ms']!s:>9} {result['latency_p95_ms']!s:>9} {result['peak_rss_mb']!s:>8}")
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "stub_models": not args.real_models,
+            "synthetic_pages": args.pages,
+            "repeats": args.repeats
+        },
+        "results": results
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        compare(args.compare, results)
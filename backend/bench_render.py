@@ -0,0 +1,101 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import tempfile
+import time
+import fitz
+import main
+from bench_pipeline import make_synthetic_pdf
+from batched_ocr import pixmap_to_array
+from parallel_ocr import pixmap_to_image, tesseract_ocr
+from render_profiles import RENDER_PROFILES, render_settings, render_page
+
+# OCR time against character accuracy for every render profile and OCR engine.
+# Pages that carry a text layer are rendered to images and OCR'd, the text layer is the ground truth
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE_PDFS = ["MLintro1.pdf", "demo_en.pdf"]
+
+def normalize(text):
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def char_accuracy(reference, hypothesis):
+    # 1 - character error rate, floored at 0
+    reference, hypothesis = normalize(reference), normalize(hypothesis)
+    if not reference:
+        return None
+    return max(0.0, 1 - edit_distance(reference, hypothesis) / len(reference))
+
+def ocr_page(page, settings, engine):
+    start = time.perf_counter()
+    pix = render_page(page, settings)
+    rendered = time.perf_counter()
+    if engine == "rule":
+        text = tesseract_ocr(pixmap_to_image(pix), settings["binarize"])
+    else:
+        text = " ".join(main.model_registry.get("easyocr").readtext(pixmap_to_array(pix), detail=0))
+    return text, rendered - start, time.perf_counter() - rendered, (pix.width, pix.height)
+
+def bench_profile(pages, profile, engine):
+    settings = render_settings(profile, engine)
+    render_times, ocr_times, accuracies = [], [], []
+    size = None
+    for page, reference in pages:
+        text, render_seconds, ocr_seconds, size = ocr_page(page, settings, engine)
+        render_times.append(render_seconds)
+        ocr_times.append(ocr_seconds)
+        accuracy = char_accuracy(reference, text)
+        if accuracy is not None:
+            accuracies.append(accuracy)
+    return {
+        "engine": engine,
+        "profile": profile,
+        "settings": settings,
+        "pages": len(pages),
+        "image_size": size,
+        "render_ms_per_page": round(statistics.mean(render_times) * 1000, 1),
+        "ocr_ms_per_page": round(statistics.mean(ocr_times) * 1000, 1),
+        "char_accuracy": round(statistics.mean(accuracies), 4) if accuracies else None
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OCR time vs character accuracy per render profile")
+    parser.add_argument("--pdf", action="append", help="PDF with a text layer (default: bundled samples)")
+    parser.add_argument("--synthetic-pages", type=int, default=5)
+    parser.add_argument("--engines", default="rule,ai")
+    parser.add_argument("--profiles", default=",".join(RENDER_PROFILES))
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    paths = args.pdf or [os.path.join(BACKEND_DIR, name) for name in SAMPLE_PDFS]
+    if args.synthetic_pages:
+        paths.append(make_synthetic_pdf(os.path.join(tempfile.mkdtemp(prefix="eduai-bench-"), "synthetic.pdf"),
+                                        args.synthetic_pages))
+    documents = [fitz.open(path) for path in paths]
+    pages = [(page, page.get_text()) for document in documents for page in document if page.get_text().strip()]
+    print(f"{len(pages)} pages with a text layer from {len(documents)} documents")
+
+    results = []
+    print(f"{'engine':<7} {'profile':<9} {'size':>11} {'render ms':>10} {'OCR ms':>9} {'accuracy':>9}")
+    for engine in args.engines.split(","):
+        for profile in args.profiles.split(","):
+            result = bench_profile(pages, profile, engine)
+            results.append(result)
+            size = "x".join(map(str, result["image_size"]))
+            print(f"{engine:<7} {profile:<9} {size:>11} {result['render_ms_per_page']:>10} "
+                  f"{result['ocr_ms_per_page']:>9} {result['char_accuracy']!s:>9}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,169 @@
+import argparse
+import json
+import random
+import re
+import time
+from collections import Counter
+import importlib.util
+import os
+
+# Per-page throughput of the rule-based engine against the previous per-call implementation
+
+rule_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "RULE_BASED_backend.py")
+spec = importlib.util.spec_from_file_location("rule_module", rule_path)
+rule_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(rule_module)
+
+# --- Previous implementation, kept here only as the benchmark baseline ---
+
+def legacy_load_dictionary():
+    with open(rule_module.DICT_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+legacy_translation_dict = legacy_load_dictionary()
+
+def legacy_translate(paragraph):
+    lines = paragraph.strip().split('\n')
+    return '\n'.join(' '.join(legacy_translation_dict.get(w, w) for w in line.lower().split()) for line in lines)
+
+def legacy_summarize(paragraph):
+    sentences = re.split(r'(?<=[.!?])\s+', paragraph.strip())
+    if len(sentences) <= 2:
+        return paragraph.strip()
+    first = sentences[0]
+    last = sentences[-1]
+    middle_sentences = sentences[1:-1]
+    words = re.findall(r'\b\w+\b', paragraph.lower())
+    stopwords = set([
+        'the', 'a', 'an', 'and', 'is', 'was', 'are', 'were', 'of', 'to', 'in',
+        'on', 'at', 'by', 'with', 'for', 'as', 'from', 'that', 'this', 'it',
+        'but', 'be', 'have', 'has', 'had', 'i', 'you', 'he', 'she', 'they', 'we'
+    ])
+    content_words = [w for w in words if w not in stopwords]
+    common_words = set(w for w, _ in Counter(content_words).most_common(5))
+    scored_middle = []
+    for sent in middle_sentences:
+        sent_words = set(re.findall(r'\b\w+\b', sent.lower()))
+        score = len(sent_words & common_words)
+        scored_middle.append((score, sent))
+    scored_middle.sort(reverse=True)
+    num_keep = len(middle_sentences) // 2
+    selected_middle = [s for _, s in scored_middle[:num_keep]]
+    return ' '.join([first] + selected_middle + [last])
+
+def legacy_clean_leading_phrases(sentence):
+    leading_phrases = [
+        'suddenly', 'nearby', 'later', 'then', 'afterward', 'however', 'moreover', 'therefore',
+        'meanwhile', 'consequently', 'first', 'second', 'third', 'finally', 'next', 'in addition',
+        'besides', 'furthermore', 'hence', 'thus', 'accordingly', 'nonetheless', 'still', 'otherwise',
+        'alternatively', 'subsequently', 'eventually', 'overall', 'additionally', 'incidentally',
+        'as', 'since'
+    ]
+    pattern = r'^(?:' + '|'.join(re.escape(phrase) for phrase in leading_phrases) + r')[, ]+\s*'
+    return re.sub(pattern, '', sentence.strip(), flags=re.IGNORECASE)
+
+def legacy_make_interrogative(sentence):
+    sentence = legacy_clean_leading_phrases(sentence)
+    words = sentence.split()
+    if len(words) < 2:
+        return sentence
+    auxiliaries = ['is', 'are', 'was', 'were', 'can', 'could', 'will', 'would', 'should', 'has', 'have', 'had', 'does', 'do', 'did']
+    aux_index = -1
+    for i in range(min(4, len(words))):
+        if words[i].lower() in auxiliaries:
+            aux_index = i
+            break
+    if aux_index != -1:
+        aux = words[aux_index].capitalize()
+        rest = words[:aux_index] + words[aux_index+1:]
+        return f"{aux} {' '.join(rest)}?"
+    if len(words) > 1 and words[1].lower().endswith('ed'):
+        base_verb = words[1][:-2]
+        if words[1].lower().endswith('ied'):
+            base_verb = words[1][:-3] + 'y'
+        return f"Did {words[0]} {base_verb} {' '.join(words[2:])}?".replace('  ', ' ').strip()
+    subject = words[0].lower()
+    aux = 'Does' if subject in ['he', 'she', 'it'] else 'Do'
+    return f"{aux} {subject} {' '.join(words[1:])}?".replace('  ', ' ').strip()
+
+def legacy_quizify(paragraph, n=3):
+    sentences = [s.strip() for s in re.split(r'[.!?]', paragraph) if s.strip()]
+    sampled = random.sample(sentences, min(n, len(sentences)))
+    return [(legacy_make_interrogative(s), s) for s in sampled]
+
+# --- Synthetic document ---
+
+SENTENCES = [
+    "However, the model was trained on a large corpus of lecture notes.",
+    "Then the students reviewed the results and discussed the errors.",
+    "The professor explained why overfitting happens with small datasets.",
+    "Meanwhile the assistant graded the exercises from the previous week.",
+    "Finally, the class compared linear regression with decision trees.",
+    "It is important to split the data before training any model.",
+    "She studied the gradient descent algorithm in detail.",
+    "As a result the accuracy improved on the test set.",
+]
+
+FRENCH_SENTENCES = [
+    "Aujourd'hui, l'étudiant lit le livre de son professeur.",
+    "Le chat est noir, mais la maison est très grande.",
+    "D'après le cours, un modèle simple est souvent le premier choix.",
+    "Les données sont divisées en deux parties avant l'entraînement.",
+    "Nous avons déjà vu cette méthode la semaine dernière.",
+]
+
+def make_pages(num_pages, sentences_per_page, seed=0, sentences=SENTENCES):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(sentences) for _ in range(sentences_per_page)) for _ in range(num_pages)]
+
+def timed_call(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def pages_per_sec(fn, pages, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(pages)
+        best = min(best, time.perf_counter() - start)
+    return len(pages) / best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rule-based engine micro-benchmark")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--sentences-per-page", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.sentences_per_page)
+    assert [legacy_summarize(p) for p in pages] == rule_module.summarize_pages(pages)
+    random.seed(0)
+    legacy_quiz = [legacy_quizify(p) for p in pages]
+    random.seed(0)
+    assert legacy_quiz == rule_module.quizify_pages(pages)
+
+    french_pages = make_pages(args.pages, args.sentences_per_page, sentences=FRENCH_SENTENCES)
+    cases = {
+        "translate": (lambda ps: [legacy_translate(p) for p in ps], rule_module.translate_pages),
+        "summarize": (lambda ps: [legacy_summarize(p) for p in ps], rule_module.summarize_pages),
+        "quiz": (lambda ps: [legacy_quizify(p) for p in ps], rule_module.quizify_pages),
+    }
+    results = {}
+    for name, (legacy, engine) in cases.items():
+        case_pages = french_pages if name == "translate" else pages
+        before = pages_per_sec(legacy, case_pages, args.repeats)
+        after = pages_per_sec(engine, case_pages, args.repeats)
+        results[name] = {"legacy_pages_per_sec": round(before, 1), "engine_pages_per_sec": round(after, 1),
+                         "speedup": round(after / before, 2)}
+    load_times = {
+        "json_load_ms": round(min(timed_call(legacy_load_dictionary) for _ in range(args.repeats)) * 1000, 2),
+        "index_load_ms": round(min(timed_call(rule_module.load_translation_index) for _ in range(args.repeats)) * 1000, 2),
+    }
+    words = [w for p in french_pages for w in p.lower().split()]
+    results["translate"]["legacy_word_hit_rate"] = round(sum(w in legacy_translation_dict for w in words) / len(words), 3)
+    results["translate"]["engine_word_hit_rate"] = round(sum(rule_module.translate_word(w) != w for w in words) / len(words), 3)
+
+    print(f"{args.pages} pages x {args.sentences_per_page} sentences")
+    print(json.dumps(load_times))
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,83 @@
+import importlib
+import os
+import threading
+import time
+
+# torch, transformers and EasyOCR take seconds to import. In the default deferred startup mode they are imported
+# on a background thread, so the server answers health checks and rule-based requests while they load;
+# EDUAI_STARTUP=eager imports them before the app starts serving, as before
+STARTUP_MODE = os.environ.get("EDUAI_STARTUP", "deferred").lower()
+HEAVY_MODULES = ["torch", "transformers", "easyocr"]
+
+class DeferredImports:
+    def __init__(self, names=HEAVY_MODULES):
+        self.names = names
+        self.modules = {}
+        self.errors = {}
+        self.seconds = {}
+        self.hooks = {}
+        self.loading = None
+        self.done = {name: threading.Event() for name in names}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def on_import(self, name, hook):
+        # hook(module) runs right after the import, before any caller of get() receives the module
+        self.hooks.setdefault(name, []).append(hook)
+
+    def load(self, name):
+        if self.done[name].is_set():
+            return
+        self.loading = name
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(name)
+            for hook in self.hooks.get(name, []):
+                hook(module)
+            self.modules[name] = module
+            print(f"✅ {name} imported in {time.perf_counter() - started:.1f}s")
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"
+            print(f"❌ Could not import {name}:", e)
+        self.seconds[name] = round(time.perf_counter() - started, 2)
+        self.loading = None
+        self.done[name].set()
+
+    def load_all(self):
+        for name in self.names:
+            self.load(name)
+
+    def start(self, after=None):
+        # Imports every module in order on one thread, then runs after()
+        def run():
+            self.load_all()
+            if after:
+                after()
+
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=run, name="eduai-imports", daemon=True)
+                self.thread.start()
+
+    def get(self, name):
+        # Waits for this module only, not for the ones imported after it
+        if not self.done[name].is_set():
+            self.start()
+            self.done[name].wait()
+        if name in self.errors:
+            raise ImportError(f"{name} is not available: {self.errors[name]}")
+        return self.modules[name]
+
+    def is_ready(self, *names):
+        return all(name in self.modules for name in names)
+
+    def status(self):
+        status = {}
+        for name in self.names:
+            if name in self.modules:
+                status[name] = {"state": "ready", "seconds": self.seconds[name]}
+            elif name in self.errors:
+                status[name] = {"state": "error", "error": self.errors[name]}
+            else:
+                status[name] = {"state": "loading" if self.loading == name else "pending"}
+        return status
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+from docx import Document
+from metrics import stage_timer
+
+# Export stage: every finished page is appended to each requested output format right away,
+# so the pipeline never has to hold the whole processed document in memory
+
+def is_quiz(mode, output):
+    return mode == "quiz" and isinstance(output, list)
+
+class ExportWriter:
+    # Page numbers are the document's own, so a page range export is labelled 15, 16, ... rather than 1, 2, ...
+    extension = None
+
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self.pages_written = 0
+
+    def write_page(self, page_number, output):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class TxtWriter(ExportWriter):
+    extension = "txt"
+
+    def __init__(self, path, mode):
+        super().__init__(path, mode)
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write_page(self, page_number, output):
+        self.file.write(f"=== Page {page_number} ===\n\n")
+        if is_quiz(self.mode, output):
+            for q, a in output:
+                self.file.write(f"Q: {q}\nA: {a}\n\n")
+        else:
+            self.file.write(f"{output}\n\n")
+        self.file.write("=" * 40 + "\n\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class DocxWriter(ExportWriter):
+    # python-docx keeps the document tree in memory until save, pages are still added as they arrive
+    extension = "docx"
+
+    def __init__(self, path, mode):
+        super().__init__(path, mode)
+        self.doc = Document()
+        self.doc.add_heading(f'Document Processing: {mode.capitalize()}', 0)
+
+    def write_page(self, page_number, output):
+        if self.pages_written:
+            self.doc.add_page_break()
+        self.pages_written += 1
+        self.doc.add_heading(f'Page {page_number}', level=1)
+        if is_quiz(self.mode, output):
+            for q, a in output:
+                self.doc.add_paragraph(f"Q: {q}", style='List Bullet')
+                self.doc.add_paragraph(f"A: {a}")
+        else:
+            self.doc.add_paragraph(str(output))
+
+    def close(self):
+        self.doc.save(self.path)
+
+class MarkdownWriter(TxtWriter):
+    extension = "md"
+
+    def __init__(self, path, mode):
+        super().__init__(path, mode)
+        self.file.write(f"# Document Processing: {mode.capitalize()}\n\n")
+
+    def write_page(self, page_number, output):
+        self.file.write(f"## Page {page_number}\n\n")
+        if is_quiz(self.mode, output):
+            for q, a in output:
+                self.file.write(f"- **Q:** {q}\n  **A:** {a}\n")
+            self.file.write("\n")
+        else:
+            self.file.write(f"{output}\n\n")
+        self.file.flush()
+
+class JsonWriter(TxtWriter):
+    # A JSON object whose "pages" array is written one element at a time
+    extension = "json"
+
+    def __init__(self, path, mode):
+        super().__init__(path, mode)
+        self.file.write(f'{{"mode": {json.dumps(mode)}, "pages": [')
+
+    def write_page(self, page_number, output):
+        if self.pages_written:
+            self.file.write(", ")
+        self.pages_written += 1
+        self.file.write(json.dumps({"page": page_number, "output": output}, ensure_ascii=False))
+        self.file.flush()
+
+    def close(self):
+        self.file.write("]}\n")
+        super().close()
+
+WRITERS = {writer.extension: writer for writer in (TxtWriter, DocxWriter, MarkdownWriter, JsonWriter)}
+DEFAULT_FORMATS = ["txt", "docx"]
+
+def write_document(path, fmt, mode, pages):
+    # Writes a whole document from (page number, output) pairs, used to rebuild an evicted download
+    writer = WRITERS[fmt](path, mode)
+    try:
+        for page_number, output in pages:
+            writer.write_page(page_number, output)
+    finally:
+        writer.close()
+
+class DocumentExport:
+    def __init__(self, directory, base_filename, mode, formats=DEFAULT_FORMATS, store=None):
+        # With an artifact store, files are written under temporary names and moved to a content-addressed
+        # name on finish, together with a manifest of the page output keys they can be rebuilt from
+        self.base_filename = base_filename
+        self.mode = mode
+        self.store = store
+        if store:
+            self.paths = {fmt: store.partial_path(fmt) for fmt in formats}
+        else:
+            self.paths = {fmt: os.path.join(directory, f"{base_filename}.{fmt}") for fmt in formats}
+        self.writers = []
+        self.page1 = None
+        self.total_pages = 0
+        self.page_sources = {"text_layer": [], "ocr": []}
+        self.reused_pages = 0
+        self.digest = hashlib.sha256(mode.encode('utf-8'))
+        self.output_keys = []
+        self.page_numbers = []
+        try:
+            for fmt, path in self.paths.items():
+                self.writers.append(WRITERS[fmt](path, mode))
+        except Exception:
+            self.abort()
+            raise
+
+    def add_page(self, page):
+        self.total_pages += 1
+        if self.total_pages == 1:
+            self.page1 = page["output"]
+        page_number = page.get("page_number", self.total_pages)
+        self.page_sources[page["source"]].append(page_number)
+        self.reused_pages += int(page.get("reused", False))
+        self.digest.update(json.dumps([page_number, page["output"]], ensure_ascii=False).encode('utf-8'))
+        self.output_keys.append(page.get("output_key"))
+        self.page_numbers.append(page_number)
+        with stage_timer("export"):
+            for writer in self.writers:
+                writer.write_page(page_number, page["output"])
+
+    def finish(self):
+        with stage_timer("export"):
+            for writer in self.writers:
+                writer.close()
+            if self.store:
+                content_hash = self.digest.hexdigest()[:16]
+                regenerable = all(self.output_keys)
+                for fmt, path in self.paths.items():
+                    manifest = {"mode": self.mode, "format": fmt, "output_keys": self.output_keys,
+                                "page_numbers": self.page_numbers} if regenerable else None
+                    self.paths[fmt] = self.store.add(f"{self.base_filename}_{content_hash}.{fmt}", path, manifest)
+        result = {
+            "page1": self.page1,
+            "total_pages": self.total_pages,
+            "filename": self.base_filename,
+            "page_sources": self.page_sources,
+            "reused_pages": self.reused_pages
+        }
+        for fmt, path in self.paths.items():
+            result[f"download_{fmt}"] = f"/downloads/{os.path.basename(path)}"
+        return result
+
+    def abort(self):
+        # Partial files are removed so a failed run never leaves a truncated download behind
+        for writer in self.writers:
+            try:
+                writer.close()
+            except Exception:
+                pass
+        for path in self.paths.values():
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,111 @@
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from metrics import Histogram, RequestTimings, current_timings, register, use_timings
+
+# Cross-request micro-batching: items for the same model and settings from every in-flight request
+# are collected for a short window and run as one batch. Each model has a single scheduler thread,
+# so its tokenizer (not thread-safe) and weights are only ever used from that thread
+MAX_BATCH_SIZE = int(os.environ.get("EDUAI_BATCH_MAX_SIZE", "32"))
+MAX_WAIT_SECONDS = float(os.environ.get("EDUAI_BATCH_MAX_WAIT_MS", "10")) / 1000
+
+BATCH_SIZES = register(Histogram("eduai_inference_batch_size", "Items per scheduled model call",
+                                 buckets=(1, 2, 4, 8, 16, 32, 64, 128)))
+BATCH_CALLERS = register(Histogram("eduai_inference_batch_callers", "Requests sharing one scheduled model call",
+                                   buckets=(1, 2, 3, 4, 6, 8, 16)))
+
+class InferenceScheduler:
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT_SECONDS):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.condition = threading.Condition()
+        self.queues = {}
+        self.runners = {}
+        self.active = {}
+        self.workers = {}
+
+    def run(self, key, items, runner):
+        # key starts with the model name; runner(list of items) returns one result per item.
+        # Blocks until every item has its result
+        if not items:
+            return []
+        caller = object()
+        timings = current_timings()
+        futures = [Future() for _ in items]
+        with self.condition:
+            self.runners[key] = runner
+            self.active[key] = self.active.get(key, 0) + 1
+            pending = self.queues.setdefault(key, deque())
+            pending.extend((item, future, caller, timings) for item, future in zip(items, futures))
+            model = key[0]
+            if model not in self.workers:
+                self.workers[model] = threading.Thread(target=self.dispatch, args=(model,), daemon=True,
+                                                       name=f"eduai-infer-{model}")
+                self.workers[model].start()
+            self.condition.notify_all()
+        try:
+            return [future.result() for future in futures]
+        finally:
+            with self.condition:
+                self.active[key] -= 1
+                self.condition.notify_all()
+
+    def next_key(self, model, after):
+        # Round-robin over the settings queued for one model so none of them starves
+        keys = [key for key in self.queues if key[0] == model]
+        if after in keys:
+            start = keys.index(after) + 1
+            keys = keys[start:] + keys[:start]
+        return next((key for key in keys if self.queues[key]), None)
+
+    def dispatch(self, model):
+        key = None
+        while True:
+            with self.condition:
+                while self.next_key(model, key) is None:
+                    self.condition.wait()
+                key = self.next_key(model, key)
+                pending = self.queues[key]
+                deadline = time.monotonic() + self.max_wait
+                while len(pending) < self.max_batch_size:
+                    # Once every active caller has items queued nobody else can join, so waiting is pointless
+                    callers = {entry[2] for entry in itertools.islice(pending, self.max_batch_size)}
+                    remaining = deadline - time.monotonic()
+                    if len(callers) >= self.active[key] or remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                batch = [pending.popleft() for _ in range(min(len(pending), self.max_batch_size))]
+                runner = self.runners[key]
+            self.execute(key, runner, batch)
+
+    def execute(self, key, runner, batch):
+        shared = RequestTimings()
+        try:
+            with use_timings(shared):
+                results = runner([item for item, _, _, _ in batch])
+        except BaseException as e:
+            for _, future, _, _ in batch:
+                future.set_exception(e)
+            return
+
+        BATCH_SIZES.observe(len(batch), model=key[0])
+        BATCH_CALLERS.observe(len({caller for _, _, caller, _ in batch}), model=key[0])
+        # Tokens of a shared batch are split between the requests by how many items each one sent
+        shares = {}
+        for _, _, _, timings in batch:
+            if timings is not None:
+                shares[timings] = shares.get(timings, 0) + 1
+        for timings, count in shares.items():
+            timings.add_tokens(round(shared.tokens_generated * count / len(batch)))
+        for (_, future, _, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def pending(self):
+        with self.condition:
+            counts = {}
+            for key, queue in self.queues.items():
+                counts[(("model", key[0]),)] = counts.get((("model", key[0]),), 0) + len(queue)
+            return counts
@@ -1,24 +1,43 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 import os
-import tempfile
+import hashlib
+import itertools
+import json
+import re
 import shutil
-from pathlib import Path
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from pathlib import Path, PurePosixPath
 from werkzeug.utils import secure_filename
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
-import easyocr
 from flask_cors import CORS
 import fitz  # PyMuPDF
-from docx import Document
 import importlib.util
-from PIL import Image
-import pytesseract
+from parallel_ocr import pixmap_to_image, iter_tesseract_ocr
+from batched_ocr import pixmap_to_array, iter_easyocr_batched
+from result_cache import CACHE_DIR, ResultCache, file_sha256
+from model_registry import ModelRegistry
+from torch_tuning import QUANTIZE_MODELS, configure_threads, prepare_model
+from deferred_imports import STARTUP_MODE, DeferredImports
+from exporters import WRITERS, DEFAULT_FORMATS, DocumentExport, write_document
+from artifact_store import ArtifactStore, start_cleanup
+from uploads import MAX_UPLOAD_BYTES, UploadRequest, new_upload_dir, release_upload_dir, save_upload
+from render_profiles import RENDER_PROFILES, DEFAULT_RENDER_PROFILE, render_settings, render_page
+from inference_scheduler import InferenceScheduler
+from staged_pipeline import NLP_WORKERS, run_stage
+from metrics import PAGES, PAGE_SECONDS, Gauge, register, render, stage_timer, track_request, count_tokens
 
 app = Flask(__name__)
 CORS(app)
+# Uploads stream to disk chunk by chunk instead of being spooled and copied, see uploads.py
+app.request_class = UploadRequest
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES
 
 # Persistent downloads folder
 DOWNLOAD_DIR = os.path.abspath("downloads")
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
 
 # Model paths (adjust accordingly)
 base_paths = {
@@ -28,63 +47,68 @@ base_paths = {
     "summarization": "../Distilbard"
 }
 
-# Load models safely
-models = {}
+# torch, transformers and EasyOCR are imported through heavy_imports, in the background unless EDUAI_STARTUP=eager
+STARTED_AT = time.time()
+heavy_imports = DeferredImports()
+heavy_imports.on_import("torch", lambda torch: configure_threads())
 
-def load_models():
-    # Translation
-    if os.path.exists(base_paths["translation"]):
-        print("✅ Translation model found.")
-        models["translation"] = {
-            "tokenizer": AutoTokenizer.from_pretrained(base_paths["translation"]),
-            "model": AutoModelForSeq2SeqLM.from_pretrained(base_paths["translation"])
-        }
-    else:
-        print("❌ Translation model not found at:", base_paths["translation"])
-        models["translation"] = None
-
-    # Question Generation
-    if os.path.exists(base_paths["question_generation"]):
-        print("✅ Question generation model found.")
-        models["question_generation"] = {
-            "tokenizer": AutoTokenizer.from_pretrained(base_paths["question_generation"]),
-            "model": AutoModelForSeq2SeqLM.from_pretrained(base_paths["question_generation"])
-        }
-    else:
-        print("❌ Question generation model not found at:", base_paths["question_generation"])
-        models["question_generation"] = None
-
-    # Question Answering
-    if os.path.exists(base_paths["question_answering"]):
-        print("✅ QA model found.")
-        models["question_answering"] = pipeline(
-            "question-answering",
-            model=base_paths["question_answering"],
-            tokenizer=base_paths["question_answering"]
-        )
-    else:
-        print("❌ QA model not found at:", base_paths["question_answering"])
-        models["question_answering"] = None
-
-    # Summarization
-    if os.path.exists(base_paths["summarization"]):
-        print("✅ Summarization model found.")
-        models["summarization"] = {
-            "tokenizer": AutoTokenizer.from_pretrained(base_paths["summarization"]),
-            "model": AutoModelForSeq2SeqLM.from_pretrained(base_paths["summarization"])
+def resolve_transformers(transformers):
+    # transformers loads its classes on first attribute access, this moves that cost to the import thread as well
+    transformers.AutoTokenizer, transformers.AutoModelForSeq2SeqLM, transformers.pipeline
+
+heavy_imports.on_import("transformers", resolve_transformers)
+# Models listed here are loaded right after the imports, instead of on the first request that needs them
+PRELOAD_MODELS = [name.strip() for name in os.environ.get("EDUAI_PRELOAD_MODELS", "").split(",") if name.strip()]
+
+# Models are registered here and loaded on first use, see model_registry.py
+model_registry = ModelRegistry()
+
+def seq2seq_loader(name, label):
+    def load():
+        path = base_paths[name]
+        if not os.path.exists(path):
+            print(f"❌ {label} model not found at:", path)
+            return None
+        print(f"✅ {label} model found, loading.")
+        transformers = heavy_imports.get("transformers")
+        return {
+            "tokenizer": transformers.AutoTokenizer.from_pretrained(path),
+            "model": prepare_model(transformers.AutoModelForSeq2SeqLM.from_pretrained(path))
         }
-    else:
-        print("❌ Summarization model not found at:", base_paths["summarization"])
-        models["summarization"] = None
+    return load
+
+def load_qa_model():
+    path = base_paths["question_answering"]
+    if not os.path.exists(path):
+        print("❌ QA model not found at:", path)
+        return None
+    print("✅ QA model found, loading.")
+    qa_model = heavy_imports.get("transformers").pipeline("question-answering", model=path, tokenizer=path)
+    qa_model.model = prepare_model(qa_model.model)
+    return qa_model
 
-load_models()
+def load_easyocr_reader():
+    print("✅ Loading EasyOCR reader.")
+    return heavy_imports.get("easyocr").Reader(['fr'], gpu=True)
 
-# EasyOCR
-reader = easyocr.Reader(['fr'], gpu=True)
+def register_models():
+    model_registry.register("translation", seq2seq_loader("translation", "Translation"))
+    model_registry.register("question_generation", seq2seq_loader("question_generation", "Question generation"))
+    model_registry.register("question_answering", load_qa_model)
+    model_registry.register("summarization", seq2seq_loader("summarization", "Summarization"))
+    model_registry.register("easyocr", load_easyocr_reader)
 
-# Tesseract
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe" # Adjust path as needed
-os.environ["TESSDATA_PREFIX"] = r"C:\Program Files\Tesseract-OCR\tessdata"
+register_models()
+
+def preload_models():
+    for name in PRELOAD_MODELS:
+        if name not in model_registry.loaders:
+            print(f"❌ Unknown model in EDUAI_PRELOAD_MODELS: {name}")
+            continue
+        try:
+            model_registry.get(name)
+        except Exception as e:
+            print(f"❌ Could not preload {name}:", e)
 
 # Rule-based module
 rule_path = os.path.join(os.path.dirname(__file__), "RULE_BASED_backend.py")
@@ -92,143 +116,591 @@ spec = importlib.util.spec_from_file_location("rule_module", rule_path)
 rule_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(rule_module)
 
-# OCR
-def extract_raw_text(image_path, engine="easyocr"):
-    if engine == "tesseract":
-        image = Image.open(image_path)
-        return pytesseract.image_to_string(image, lang="fra")
+# Result cache: raw OCR text keyed by page fingerprint, per-action outputs keyed by page text.
+# It and the download store are opened by start_services()
+result_cache = None
+artifact_store = None
+
+# Downloads are kept under a quota; an evicted file is rebuilt from the cached page outputs it was made of
+def regenerate_download(path, manifest):
+    outputs = [result_cache.get("output", key) for key in manifest["output_keys"]]
+    if any(output is None for output in outputs):
+        return False
+    write_document(path, manifest["format"], manifest["mode"], zip(manifest["page_numbers"], outputs))
+    return True
+
+def start_services():
+    # Importing this module has no side effects: Tesseract pool workers started with spawn (the only start method
+    # on Windows) import it again. The server and the command-line tools call this once before handling work
+    global result_cache, artifact_store
+    result_cache = ResultCache()
+    artifact_store = ArtifactStore(DOWNLOAD_DIR, os.path.join(CACHE_DIR, "artifacts.sqlite3"), regenerate_download)
+    start_cleanup(artifact_store)
+    if STARTUP_MODE == "eager":
+        heavy_imports.load_all()
+        preload_models()
     else:
-        results = reader.readtext(str(image_path), detail=0)
-        return " ".join(results)
+        heavy_imports.start(after=preload_models)
+
+OCR_ENGINES = {"rule": "tesseract-fra", "ai": "easyocr-fr"}
+ACTION_MODELS = {
+    "extract": [],
+    "translate": ["translation"],
+    "summarize": ["summarization"],
+    "quiz": ["question_generation", "question_answering"]
+}
+
+def model_revision(action, process_method):
+    # Changes whenever the files behind an action are replaced, so stale outputs are never served
+    if process_method == "rule":
+        paths = [rule_path, os.path.join(os.path.dirname(rule_path), "translation_dict.json")]
+    else:
+        paths = [base_paths[name] for name in ACTION_MODELS[action]]
+    stamps = [f"{p}:{os.path.getmtime(p) if os.path.exists(p) else 'missing'}" for p in paths]
+    if process_method != "rule":
+        # int8 and fp32 models produce different outputs
+        stamps.append(f"quantized:{QUANTIZE_MODELS}")
+    return hashlib.sha1("|".join(stamps).encode('utf-8')).hexdigest()[:12]
+
+def page_fingerprint(pdf_document, page):
+    # Hashes what the page draws: geometry, content streams, images, form XObjects, and the annotations and
+    # form fields that get_pixmap() renders on top. Unchanged pages of a re-uploaded, edited PDF keep their
+    # fingerprint and their cached results
+    digest = hashlib.sha256(f"{tuple(page.rect)}|{page.rotation}".encode('utf-8'))
+    digest.update(page.read_contents())
+    xrefs = [image[0] for image in page.get_images(full=True)] + [xobject[0] for xobject in page.get_xobjects()]
+    for xref in xrefs:
+        digest.update(pdf_document.xref_stream_raw(xref) or b"")
+    for annot in itertools.chain(page.annots(), page.widgets()):
+        # Type, position, visibility flags and the appearance stream that is drawn
+        for key in ("Subtype", "Rect", "F"):
+            digest.update(pdf_document.xref_get_key(annot.xref, key)[1].encode('utf-8'))
+        kind, value = pdf_document.xref_get_key(annot.xref, "AP/N")
+        if kind == "xref":
+            digest.update(pdf_document.xref_stream_raw(int(value.split()[0])) or b"")
+    return digest.hexdigest()
+
+def ocr_cache_key(fingerprint, process_method, render_profile):
+    return f"{fingerprint}:{OCR_ENGINES[process_method]}:{render_profile}"
+
+def output_cache_key(raw_text, action, process_method):
+    # Outputs depend only on the page text, so identical text is never processed twice
+    text_hash = hashlib.sha256(raw_text.encode('utf-8')).hexdigest()
+    return f"{text_hash}:{action}:{process_method}:{model_revision(action, process_method)}"
 
 # AI functions
-def translate_french_to_english(text):
-    model_info = models["translation"]
-    if model_info is None:
-        return "Translation model not found at specified path."
+# Pages sent through model.generate together; pages are sorted by token length first so padding stays small
+SEQ2SEQ_BATCH_SIZE = int(os.environ.get("EDUAI_SEQ2SEQ_BATCH_SIZE", "8"))
+
+def batch_generate(model_info, texts, batch_size=SEQ2SEQ_BATCH_SIZE, num_return_sequences=1, **generate_kwargs):
     tokenizer = model_info["tokenizer"]
     model = model_info["model"]
-    inputs = tokenizer(text, return_tensors="pt").to(model.device)
-    outputs = model.generate(**inputs)
-    return tokenizer.decode(outputs[0], skip_special_tokens=True)
+    lengths = [len(ids) for ids in tokenizer(texts, truncation=True)["input_ids"]]
+    order = sorted(range(len(texts)), key=lambda i: lengths[i])
+    results = [None] * len(texts)
 
-def generate_questions(text):
-    model_info = models["question_generation"]
-    if model_info is None:
-        return ["Question generation model not found at specified path."]
+    for start in range(0, len(order), batch_size):
+        batch_ids = order[start:start + batch_size]
+        inputs = tokenizer([texts[i] for i in batch_ids], padding=True, truncation=True, return_tensors="pt").to(model.device)
+        with heavy_imports.get("torch").inference_mode():
+            outputs = model.generate(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"],
+                                     num_return_sequences=num_return_sequences, **generate_kwargs)
+        if tokenizer.pad_token_id is None:
+            count_tokens(outputs.numel())
+        else:
+            count_tokens(int((outputs != tokenizer.pad_token_id).sum()))
+        decoded = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+        for n, i in enumerate(batch_ids):
+            sequences = decoded[n * num_return_sequences:(n + 1) * num_return_sequences]
+            results[i] = sequences if num_return_sequences > 1 else sequences[0]
+    return results
+
+# Every in-flight request sends its texts through the scheduler, which runs them as shared batches
+inference_scheduler = InferenceScheduler()
+
+def schedule(name, texts, generate, **generate_kwargs):
+    # generate(model_info, texts, **generate_kwargs) runs on the model's scheduler thread
+    key = (name, generate.__name__) + tuple(sorted(generate_kwargs.items()))
+    return inference_scheduler.run(key, texts, lambda batch: generate(model_registry.get(name), batch, **generate_kwargs))
+
+# Long pages are split on sentence boundaries into windows the model can take in one pass
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+DEFAULT_MAX_INPUT_TOKENS = 512
+SUMMARY_MAX_ROUNDS = 3
+
+def max_input_tokens(model_info):
+    limits = [model_info["tokenizer"].model_max_length,
+              getattr(model_info["model"].config, "max_position_embeddings", None)]
+    limits = [limit for limit in limits if limit and limit < 100_000]
+    return min(limits) if limits else DEFAULT_MAX_INPUT_TOKENS
+
+def chunk_text(tokenizer, text, max_tokens):
+    sentences = [sentence for sentence in SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+    if not sentences:
+        return [text]
+    chunks = []
+    current, current_tokens = [], 0
+    for sentence, ids in zip(sentences, tokenizer(sentences, add_special_tokens=False)["input_ids"]):
+        if len(ids) > max_tokens:
+            # A single sentence longer than the window is cut on token boundaries
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            for start in range(0, len(ids), max_tokens):
+                chunks.append(tokenizer.decode(ids[start:start + max_tokens], skip_special_tokens=True))
+            continue
+        if current and current_tokens + len(ids) > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += len(ids)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def chunked_generate(model_info, texts, **generate_kwargs):
+    # All chunks of all pages go through one batched run, then are regrouped per page
     tokenizer = model_info["tokenizer"]
-    model = model_info["model"]
-    prompt = f"generate questions: {text}"
-    inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
-    outputs = model.generate(**inputs, max_length=128, num_return_sequences=3, do_sample=True)
-    return [tokenizer.decode(o, skip_special_tokens=True).split('?')[0].strip() + '?' for o in outputs]
+    budget = max(max_input_tokens(model_info) - 16, 16)
+    chunks, owners = [], []
+    for i, text in enumerate(texts):
+        for chunk in chunk_text(tokenizer, text, budget):
+            chunks.append(chunk)
+            owners.append(i)
+    outputs = batch_generate(model_info, chunks, **generate_kwargs)
+    grouped = [[] for _ in texts]
+    for owner, output in zip(owners, outputs):
+        grouped[owner].append(output)
+    return grouped
 
-def answer_questions(context, questions):
-    qa_model = models["question_answering"]
+def translate_batch(texts):
+    if model_registry.get("translation") is None:
+        return ["Translation model not found at specified path."] * len(texts)
+    return [" ".join(parts) for parts in schedule("translation", texts, chunked_generate)]
+
+def translate_french_to_english(text):
+    return translate_batch([text])[0]
+
+def generate_questions_batch(texts):
+    if model_registry.get("question_generation") is None:
+        return [["Question generation model not found at specified path."] for _ in texts]
+    prompts = [f"generate questions: {text}" for text in texts]
+    outputs = schedule("question_generation", prompts, batch_generate, num_return_sequences=3, max_length=128,
+                       do_sample=True)
+    return [dedupe_questions([o.split('?')[0].strip() + '?' for o in sequences]) for sequences in outputs]
+
+def generate_questions(text):
+    return generate_questions_batch([text])[0]
+
+# Sampled questions often repeat each other, near-duplicates are dropped before QA
+NEAR_DUPLICATE_RATIO = 0.85
+QA_BATCH_SIZE = int(os.environ.get("EDUAI_QA_BATCH_SIZE", "16"))
+
+def normalize_question(question):
+    return " ".join(re.sub(r'[^\w\s]', ' ', question.lower()).split())
+
+def dedupe_questions(questions):
+    kept, kept_normalized = [], []
+    for question in questions:
+        normalized = normalize_question(question)
+        if not normalized:
+            continue
+        if any(SequenceMatcher(None, normalized, other).ratio() >= NEAR_DUPLICATE_RATIO for other in kept_normalized):
+            continue
+        kept.append(question)
+        kept_normalized.append(normalized)
+    return kept
+
+def run_qa(pairs):
+    qa_model = model_registry.get("question_answering")
+    with heavy_imports.get("torch").inference_mode():
+        answers = qa_model(question=[q for q, _ in pairs], context=[context for _, context in pairs],
+                           batch_size=QA_BATCH_SIZE)
+    return [answers] if isinstance(answers, dict) else answers
+
+def answer_questions_batch(contexts, questions_per_page):
+    qa_model = model_registry.get("question_answering")
     if qa_model is None:
-        return [(q, "QA model not found at specified path.") for q in questions]
-    return [(q, qa_model(question=q, context=context)["answer"]) for q in questions]
+        return [[(q, "QA model not found at specified path.") for q in questions] for questions in questions_per_page]
+
+    # Every (question, page) pair of the group goes through the scheduler, batched with other requests' pairs
+    pairs = [(i, q) for i, questions in enumerate(questions_per_page) for q in questions if contexts[i].strip()]
+    answers = inference_scheduler.run(("question_answering",), [(q, contexts[i]) for i, q in pairs], run_qa)
+
+    found = {(i, q): answer["answer"] for (i, q), answer in zip(pairs, answers)}
+    return [[(q, found.get((i, q), "")) for q in questions] for i, questions in enumerate(questions_per_page)]
+
+def answer_questions(context, questions):
+    return answer_questions_batch([context], [questions])[0]
+
+def summarize_batch(texts):
+    if model_registry.get("summarization") is None:
+        return ["Summarization model not found at specified path."] * len(texts)
+    # Pages longer than one window are summarized per chunk, then the joined summaries again
+    results = list(texts)
+    pending = list(range(len(texts)))
+    for round_num in range(SUMMARY_MAX_ROUNDS):
+        grouped = schedule("summarization", [results[i] for i in pending], chunked_generate,
+                           max_length=100, min_length=30, length_penalty=2.0)
+        next_pending = []
+        for i, parts in zip(pending, grouped):
+            results[i] = " ".join(parts)
+            if len(parts) > 1 and round_num < SUMMARY_MAX_ROUNDS - 1:
+                next_pending.append(i)
+        pending = next_pending
+        if not pending:
+            break
+    return results
 
 def summarize_text(text):
-    model_info = models["summarization"]
-    if model_info is None:
-        return "Summarization model not found at specified path."
-    tokenizer = model_info["tokenizer"]
-    model = model_info["model"]
-    inputs = tokenizer(text, return_tensors="pt").to(model.device)
-    outputs = model.generate(**inputs, max_length=100, min_length=30, length_penalty=2.0)
-    return tokenizer.decode(outputs[0], skip_special_tokens=True)
+    return summarize_batch([text])[0]
 
-# PDF to images
-def pdf_to_images(pdf_path):
-    pdf_document = fitz.open(pdf_path)
-    images = []
-    for page_num in range(len(pdf_document)):
+# PDF pages rendered in memory, one at a time
+def iter_page_pixmaps(pdf_document, page_nums, settings):
+    for page_num in page_nums:
+        with stage_timer("rasterize"):
+            pix = render_page(pdf_document.load_page(page_num), settings)
+        yield pix
+
+# Born-digital pages already carry their text, only scanned pages need OCR
+MIN_TEXT_LAYER_CHARS = int(os.environ.get("EDUAI_MIN_TEXT_LAYER_CHARS", "50"))
+
+def native_page_text(page):
+    text = page.get_text()
+    letters = sum(ch.isalnum() for ch in text)
+    if letters < MIN_TEXT_LAYER_CHARS:
+        return None
+    # Fonts without a unicode mapping come back as replacement characters
+    if text.count("\ufffd") > letters * 0.1:
+        return None
+    return text.strip()
+
+def iter_page_texts(pdf_document, process_method, use_text_layer=True, render_profile=DEFAULT_RENDER_PROFILE,
+                    page_numbers=None, cancel=None):
+    # page_numbers limits the work to selected pages, the others are never loaded or rendered.
+    # cancel is the pipeline's shared event, checked between pages
+    settings = render_settings(render_profile, process_method)
+    pages = []
+    for page_num in range(len(pdf_document)) if page_numbers is None else page_numbers:
+        if cancel is not None and cancel.is_set():
+            return
         page = pdf_document.load_page(page_num)
-        pix = page.get_pixmap()
-        image_path = os.path.join(tempfile.gettempdir(), f"page_{page_num}.png")
-        pix.save(image_path)
-        images.append(image_path)
-    pdf_document.close()
-    return images
+        info = {"page_num": page_num, "raw_text": None, "source": "ocr", "ocr_reused": False}
+        text = None
+        if use_text_layer:
+            with stage_timer("text_layer"):
+                text = native_page_text(page)
+        if text is not None:
+            info["raw_text"] = text
+            info["source"] = "text_layer"
+        else:
+            info["fingerprint"] = page_fingerprint(pdf_document, page)
+            info["raw_text"] = result_cache.get("ocr", ocr_cache_key(info["fingerprint"], process_method, render_profile))
+            info["ocr_reused"] = info["raw_text"] is not None
+        pages.append(info)
+    ocr_pages = [info["page_num"] for info in pages if info["raw_text"] is None]
+
+    # Rendering runs on its own thread, one page ahead of OCR at most by the stage queue size
+    pixmaps = run_stage(iter_page_pixmaps(pdf_document, ocr_pages, settings), name="eduai-render")
+    if not ocr_pages:
+        ocr_texts = iter(())
+    elif process_method == "rule":
+        ocr_texts = iter_tesseract_ocr((pixmap_to_image(pix) for pix in pixmaps), settings["binarize"])  # Tesseract, page-parallel
+    else:
+        ocr_texts = iter_easyocr_batched(model_registry.get("easyocr"), (pixmap_to_array(pix) for pix in pixmaps))  # EasyOCR, batched
+
+    try:
+        for info in pages:
+            if cancel is not None and cancel.is_set():
+                return
+            if info["raw_text"] is None:
+                with stage_timer("ocr"):
+                    info["raw_text"] = next(ocr_texts)
+                result_cache.put("ocr", ocr_cache_key(info["fingerprint"], process_method, render_profile), info["raw_text"])
+            yield info
+    finally:
+        # Stops the render thread before the caller closes the document
+        pixmaps.close()
 
 # Processing logic
-def process_single_page_ai(raw_text, mode):
+def process_pages_ai(raw_texts, mode):
     if mode == "extract":
-        return raw_text
+        return list(raw_texts)
     elif mode == "translate":
-        return translate_french_to_english(raw_text)
+        return translate_batch(raw_texts)
     elif mode == "summarize":
-        return summarize_text(raw_text)
+        return summarize_batch(raw_texts)
     elif mode == "quiz":
-        questions = generate_questions(raw_text)
-        return answer_questions(raw_text, questions)
+        return answer_questions_batch(raw_texts, generate_questions_batch(raw_texts))
 
-def process_single_page_rule(raw_text, mode):
+def process_pages_rule(raw_texts, mode):
     if mode == "extract":
-        return raw_text
+        return list(raw_texts)
     elif mode == "translate":
-        return rule_module.translate(raw_text)
+        return rule_module.translate_pages(raw_texts)
     elif mode == "summarize":
-        return rule_module.summarize(raw_text)
+        return rule_module.summarize_pages(raw_texts)
     elif mode == "quiz":
-        return rule_module.quizify(raw_text, n=3)
+        return rule_module.quizify_pages(raw_texts, n=3)
 
-# Run pipeline
-def run_pipeline(pdf_path, mode, process_method):
-    image_files = pdf_to_images(pdf_path)
-    processed_pages = []
+def process_pages(raw_texts, mode, process_method):
+    if process_method == "rule":
+        return process_pages_rule(raw_texts, mode)
+    return process_pages_ai(raw_texts, mode)
 
-    for img_path in image_files:
-        if process_method == "rule":
-            raw_text = extract_raw_text(img_path, engine="tesseract")
-            output = process_single_page_rule(raw_text, mode)
+# Pages are handed to the models in groups so generation can be batched across pages
+PAGE_GROUP_SIZE = int(os.environ.get("EDUAI_PAGE_GROUP_SIZE", "16"))
+
+def process_page_group(group, mode, process_method):
+    # Returns one (output, reused) pair per page, only pages without a cached output reach the models
+    if mode == "extract":
+        # Stored like any other output so an evicted download can be rebuilt from the cache
+        for page in group:
+            result_cache.put("output", output_cache_key(page["raw_text"], mode, process_method), page["raw_text"])
+        return [(page["raw_text"], page["ocr_reused"]) for page in group]
+
+    results = {}
+    missing = []
+    for page in group:
+        cached = result_cache.get("output", output_cache_key(page["raw_text"], mode, process_method))
+        if cached is None:
+            missing.append(page)
         else:
-            raw_text = extract_raw_text(img_path)  # EasyOCR
-            output = process_single_page_ai(raw_text, mode)
+            results[page["page_num"]] = (cached, True)
+
+    if missing:
+        with stage_timer("nlp"):
+            fresh = process_pages([page["raw_text"] for page in missing], mode, process_method)
+        for page, output in zip(missing, fresh):
+            results[page["page_num"]] = (output, False)
+            result_cache.put("output", output_cache_key(page["raw_text"], mode, process_method), output)
+
+    return [results[page["page_num"]] for page in group]
+
+# Run pipeline
+def count_pages(pdf_path):
+    with fitz.open(pdf_path) as pdf_document:
+        return len(pdf_document)
+
+def parse_page_ranges(spec, total_pages):
+    # "1-10,15" -> sorted zero-based page numbers; "10-" runs to the last page
+    page_numbers = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        try:
+            start = int(first)
+            end = (int(last) if last.strip() else total_pages) if dash else start
+        except ValueError:
+            raise ValueError(f"Invalid page range '{part}', use e.g. 1-10,15")
+        if start < 1 or end < start or end > total_pages:
+            raise ValueError(f"Page range '{part}' is outside 1-{total_pages}")
+        page_numbers.update(range(start - 1, end))
+    if not page_numbers:
+        raise ValueError("No pages selected")
+    return sorted(page_numbers)
+
+def iter_page_groups(pdf_path, process_method, use_text_layer=True, render_profile=DEFAULT_RENDER_PROFILE,
+                     first_group_size=1, page_numbers=None, cancel=None):
+    pdf_document = fitz.open(pdf_path)
+    pages = iter_page_texts(pdf_document, process_method, use_text_layer, render_profile, page_numbers, cancel)
+
+    try:
+        # Pages stream from the renderer straight into OCR, nothing is written to disk
+        # Groups start small so the first result is out quickly, then grow to the full batch size
+        group_size = first_group_size
+        while True:
+            group = list(itertools.islice(pages, group_size))
+            if not group or (cancel is not None and cancel.is_set()):
+                break
+            group_size = min(group_size * 2, PAGE_GROUP_SIZE)
+            yield group
+    finally:
+        pages.close()
+        pdf_document.close()
+
+def pipeline_page(page, output, reused, mode, process_method):
+    return {
+        "page_number": page["page_num"] + 1,
+        "raw_text": page["raw_text"],
+        "output": output,
+        "source": page["source"],
+        "reused": reused,
+        "output_key": output_cache_key(page["raw_text"], mode, process_method)
+    }
+
+def iter_pipeline(pdf_path, mode, process_method, use_text_layer=True, render_profile=DEFAULT_RENDER_PROFILE,
+                  page_numbers=None):
+    # Stages overlap: rendering, OCR and the models each run on their own threads while the caller exports,
+    # so a document takes about as long as its slowest stage
+    cancel = threading.Event()
+    groups = run_stage(iter_page_groups(pdf_path, process_method, use_text_layer, render_profile,
+                                        page_numbers=page_numbers, cancel=cancel),
+                       name="eduai-ocr", cancel=cancel)
+    results = run_stage(groups, lambda group: (group, process_page_group(group, mode, process_method)),
+                        workers=NLP_WORKERS, name="eduai-nlp", cancel=cancel)
+    try:
+        started = time.perf_counter()
+        for group, outputs in results:
+            # Pages of a group arrive together, each one is charged an equal share of the wait
+            page_seconds = (time.perf_counter() - started) / len(group)
 
-        processed_pages.append({
-            "raw_text": raw_text,
-            "output": output
-        })
-        os.remove(img_path)
+            for page, (output, reused) in zip(group, outputs):
+                PAGE_SECONDS.observe(page_seconds, action=mode, process_method=process_method)
+                PAGES.inc(action=mode, process_method=process_method, source=page["source"])
+                yield pipeline_page(page, output, reused, mode, process_method)
+            started = time.perf_counter()
+    finally:
+        results.close()
+
+def run_pipeline(pdf_path, mode, process_method, progress=None, use_text_layer=True,
+                 render_profile=DEFAULT_RENDER_PROFILE, page_numbers=None):
+    total_pages = count_pages(pdf_path) if page_numbers is None else len(page_numbers)
+    processed_pages = []
+    if progress:
+        progress(0, total_pages)
+
+    for page in iter_pipeline(pdf_path, mode, process_method, use_text_layer, render_profile, page_numbers):
+        processed_pages.append(page)
+        if progress:
+            progress(len(processed_pages), total_pages)
 
     return processed_pages
 
-# Create outputs
-def create_download_files(processed_pages, mode, base_filename):
-    txt_path = os.path.join(DOWNLOAD_DIR, f"{base_filename}.txt")
-    docx_path = os.path.join(DOWNLOAD_DIR, f"{base_filename}.docx")
-
-    with open(txt_path, 'w', encoding='utf-8') as f:
-        for i, page in enumerate(processed_pages):
-            f.write(f"=== Page {i+1} ===\n\n")
-            if mode == "quiz" and isinstance(page["output"], list):
-                for q, a in page["output"]:
-                    f.write(f"Q: {q}\nA: {a}\n\n")
-            else:
-                f.write(f"{page['output']}\n\n")
-            f.write("=" * 40 + "\n\n")
-
-    doc = Document()
-    doc.add_heading(f'Document Processing: {mode.capitalize()}', 0)
-    for i, page in enumerate(processed_pages):
-        doc.add_heading(f'Page {i+1}', level=1)
-        if mode == "quiz" and isinstance(page["output"], list):
-            for q, a in page["output"]:
-                doc.add_paragraph(f"Q: {q}", style='ListBullet')
-                doc.add_paragraph(f"A: {a}")
-        else:
-            doc.add_paragraph(str(page['output']))
-        if i < len(processed_pages) - 1:
-            doc.add_page_break()
-    doc.save(docx_path)
+# Batch processing: many PDFs, several actions each, one output bundle per file
+BATCH_FILE_WORKERS = int(os.environ.get("EDUAI_BATCH_FILE_WORKERS", "2"))
+# Uncompressed size allowed out of one archive, the upload limit only caps the compressed bytes
+BATCH_MAX_EXTRACTED_BYTES = int(os.environ.get("EDUAI_BATCH_MAX_EXTRACTED_MB", "2048")) * 1024 * 1024
 
-    return txt_path, docx_path
+def bundle_name(relative_path):
+    # Sub-folders are kept in the name so course/week1/intro.pdf and course/week2/intro.pdf stay apart
+    parts = [secure_filename(part) for part in PurePosixPath(relative_path).with_suffix("").parts]
+    return "__".join(part for part in parts if part) or "document"
 
-# API Endpoint
-@app.route('/<action>', methods=['POST'])
-def handle_action(action):
+def collect_pdfs(source, work_dir, max_extracted_bytes=BATCH_MAX_EXTRACTED_BYTES):
+    # Returns (relative name, local path) for every PDF in a directory tree or a zip archive
+    if os.path.isdir(source):
+        paths = sorted(p for p in Path(source).rglob("*") if p.is_file() and p.suffix.lower() == ".pdf")
+        return [(p.relative_to(source).as_posix(), str(p)) for p in paths]
+
+    pdfs = []
+    extract_dir = os.path.join(work_dir, "archive")
+    os.makedirs(extract_dir, exist_ok=True)
+    too_large = ValueError(f"The archive expands beyond {max_extracted_bytes // (1024 * 1024)} MB")
+    with zipfile.ZipFile(source) as archive:
+        members = [m for m in archive.infolist()
+                   if not m.is_dir() and m.filename.lower().endswith(".pdf") and not m.filename.startswith("__MACOSX")]
+        if sum(m.file_size for m in members) > max_extracted_bytes:
+            raise too_large
+        # The sizes in the zip headers are not trusted, the bytes actually written count against the limit too
+        extracted = 0
+        for member in members:
+            # Members are written under a sanitized flat name, never at the path stored in the archive
+            path = os.path.join(extract_dir, f"{len(pdfs)}_{bundle_name(member.filename)}.pdf")
+            with archive.open(member) as src, open(path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(1024 * 1024), b''):
+                    extracted += len(chunk)
+                    if extracted > max_extracted_bytes:
+                        raise too_large
+                    dst.write(chunk)
+            pdfs.append((member.filename, path))
+    return pdfs
+
+def process_batch_file(pdf_path, bundle_dir, actions, process_method, formats, use_text_layer, render_profile,
+                       progress=None):
+    # Pages are rendered and OCR'd once, then every action runs on the same page groups
+    os.makedirs(bundle_dir, exist_ok=True)
+    name = os.path.basename(bundle_dir)
+    exports = {}
+    try:
+        with track_request() as timings:
+            for action in actions:
+                exports[action] = DocumentExport(bundle_dir, f"{name}_{action}_{process_method}", action, formats)
+            cancel = threading.Event()
+            groups = iter_page_groups(pdf_path, process_method, use_text_layer, render_profile, PAGE_GROUP_SIZE,
+                                      cancel=cancel)
+            for group in run_stage(groups, name="eduai-ocr", cancel=cancel):
+                for action in actions:
+                    for page, (output, reused) in zip(group, process_page_group(group, action, process_method)):
+                        exports[action].add_page(pipeline_page(page, output, reused, action, process_method))
+                if progress:
+                    progress(len(group))
+            results = {}
+            for action, export in exports.items():
+                result = export.finish()
+                results[action] = {
+                    "total_pages": result["total_pages"],
+                    "page_sources": result["page_sources"],
+                    "reused_pages": result["reused_pages"],
+                    "files": {fmt: os.path.basename(path) for fmt, path in export.paths.items()}
+                }
+        manifest = {"process_method": process_method, "render_profile": render_profile, "actions": results,
+                    "timings": timings.as_dict()}
+        with open(os.path.join(bundle_dir, "manifest.json"), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        return manifest
+    except Exception:
+        for export in exports.values():
+            export.abort()
+        try:
+            os.rmdir(bundle_dir)
+        except OSError:
+            pass
+        raise
+
+def run_batch(pdfs, actions, process_method, output_dir, formats=DEFAULT_FORMATS, use_text_layer=True,
+              render_profile=DEFAULT_RENDER_PROFILE, progress=None):
+    # Files run side by side and share the OCR process pool and the loaded models
+    total_pages = 0
+    for _, path in pdfs:
+        try:
+            total_pages += count_pages(path)
+        except Exception:
+            pass
+    done = [0]
+    done_lock = threading.Lock()
+
+    def page_progress(pages):
+        with done_lock:
+            done[0] += pages
+            if progress:
+                progress(done[0], total_pages)
+
+    if progress:
+        progress(0, total_pages)
+    names = {}
+    futures = []
+    with ThreadPoolExecutor(max_workers=BATCH_FILE_WORKERS, thread_name_prefix="eduai-batch") as pool:
+        for relative_path, path in pdfs:
+            name = bundle_name(relative_path)
+            names[name] = names.get(name, 0) + 1
+            if names[name] > 1:
+                name = f"{name}_{names[name]}"
+            future = pool.submit(process_batch_file, path, os.path.join(output_dir, name), actions, process_method,
+                                 formats, use_text_layer, render_profile, page_progress)
+            futures.append((relative_path, name, future))
+
+        summary = []
+        for relative_path, name, future in futures:
+            try:
+                summary.append({"file": relative_path, "bundle": name, "status": "done", **future.result()})
+            except Exception as e:
+                summary.append({"file": relative_path, "bundle": name, "status": "error", "error": str(e)})
+
+    with open(os.path.join(output_dir, "batch_summary.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+# Request handling shared by the synchronous and job endpoints
+allowed_actions = ["extract", "translate", "summarize", "quiz"]
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    return jsonify({'error': f'Upload too large, the limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB'}), 413
+
+def validate_request(action):
     if 'pdf' not in request.files:
         return jsonify({'error': 'No file uploaded'}), 400
     file = request.files['pdf']
@@ -236,40 +708,453 @@ def handle_action(action):
         return jsonify({'error': 'No selected file'}), 400
     if not file.filename.lower().endswith('.pdf'):
         return jsonify({'error': 'Only PDF files allowed'}), 400
-
-    allowed_actions = ["extract", "translate", "summarize", "quiz"]
     if action not in allowed_actions:
         return jsonify({'error': f'Invalid action. Allowed: {allowed_actions}'}), 400
+    return None
 
+def get_process_method():
     process_method = request.form.get("process_method", "ai").lower()
     if process_method not in ["ai", "rule"]:
         process_method = "ai"
+    return process_method
 
-    temp_dir = tempfile.mkdtemp()
+def get_use_text_layer():
+    return request.form.get("use_text_layer", "true").lower() not in ["false", "0", "no"]
+
+def get_render_profile():
+    render_profile = request.form.get("render_profile", DEFAULT_RENDER_PROFILE).lower()
+    if render_profile not in RENDER_PROFILES:
+        render_profile = DEFAULT_RENDER_PROFILE
+    return render_profile
+
+def get_include_timings():
+    return request.form.get("timings", "false").lower() in ["true", "1", "yes"]
+
+def get_formats():
+    formats = [fmt.strip().lower() for fmt in request.form.get("formats", "").split(",")]
+    formats = [fmt for fmt in dict.fromkeys(formats) if fmt in WRITERS]
+    return formats or DEFAULT_FORMATS
+
+def get_page_numbers(pdf_path):
+    spec = request.form.get("pages", "").strip()
+    if not spec:
+        return None
+    try:
+        total_pages = count_pages(pdf_path)
+    except Exception:
+        raise ValueError("Not a readable PDF")
+    return parse_page_ranges(spec, total_pages)
+
+def receive_pdf(file):
+    # Moves the streamed upload into its own temp dir and resolves the optional page selection.
+    # Returns (temp_dir, pdf_path, sha256, page_numbers) and an error response of None, or None and the
+    # JSON error response for a bad selection or an upload that could not be saved
+    temp_dir = new_upload_dir()
+    pdf_path = os.path.join(temp_dir, secure_filename(file.filename) or "upload.pdf")
     try:
-        pdf_path = os.path.join(temp_dir, secure_filename(file.filename))
-        file.save(pdf_path)
+        sha256 = save_upload(file, pdf_path)
+        page_numbers = get_page_numbers(pdf_path)
+    except ValueError as e:
+        release_upload_dir(temp_dir)
+        return None, (jsonify({'error': str(e)}), 400)
+    except OSError as e:
+        release_upload_dir(temp_dir)
+        return None, (jsonify({'error': f'The upload could not be saved: {e}'}), 500)
+    except Exception:
+        release_upload_dir(temp_dir)
+        raise
+    return (temp_dir, pdf_path, sha256, page_numbers), None
 
-        processed_pages = run_pipeline(pdf_path, action, process_method)
-        base_filename = Path(file.filename).stem + f"_{action}_{process_method}"
+def start_export(filename, action, process_method, formats=DEFAULT_FORMATS):
+    base_filename = (secure_filename(Path(filename).stem) or "document") + f"_{action}_{process_method}"
+    return DocumentExport(DOWNLOAD_DIR, base_filename, action, formats, store=artifact_store)
 
-        txt_path, docx_path = create_download_files(processed_pages, action, base_filename)
+def process_document(pdf_path, filename, action, process_method, progress=None, use_text_layer=True,
+                     formats=DEFAULT_FORMATS, include_timings=False, render_profile=DEFAULT_RENDER_PROFILE,
+                     page_numbers=None):
+    with track_request() as timings:
+        total_pages = count_pages(pdf_path) if page_numbers is None else len(page_numbers)
+        if progress:
+            progress(0, total_pages)
+        export = start_export(filename, action, process_method, formats)
+        try:
+            for page in iter_pipeline(pdf_path, action, process_method, use_text_layer, render_profile, page_numbers):
+                export.add_page(page)
+                if progress:
+                    progress(export.total_pages, total_pages)
+            result = export.finish()
+        except Exception:
+            export.abort()
+            raise
+        if include_timings:
+            result["timings"] = timings.as_dict()
+        return result
 
-        return jsonify({
-            "page1": processed_pages[0]["output"],
-            "total_pages": len(processed_pages),
-            "download_txt": f"/downloads/{Path(txt_path).name}",
-            "download_docx": f"/downloads/{Path(docx_path).name}",
-            "filename": base_filename
-        })
+# API Endpoint
+@app.route('/<action>', methods=['POST'])
+def handle_action(action):
+    error = validate_request(action)
+    if error:
+        return error
+    file = request.files['pdf']
+    process_method = get_process_method()
+
+    received, error = receive_pdf(file)
+    if error:
+        return error
+    temp_dir, pdf_path, _, page_numbers = received
+    try:
+        return jsonify(process_document(pdf_path, file.filename, action, process_method,
+                                        use_text_layer=get_use_text_layer(), formats=get_formats(),
+                                        include_timings=get_include_timings(),
+                                        render_profile=get_render_profile(), page_numbers=page_numbers))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    finally:
+        release_upload_dir(temp_dir)
+
+# Streaming endpoint: one event per page as soon as it is ready, NDJSON by default or SSE on request
+def encode_event(event, use_sse):
+    data = json.dumps(event, ensure_ascii=False)
+    if use_sse:
+        return f"event: {event['event']}\ndata: {data}\n\n"
+    return data + "\n"
+
+@app.route('/<action>/stream', methods=['POST'])
+def stream_action(action):
+    error = validate_request(action)
+    if error:
+        return error
+    file = request.files['pdf']
+    process_method = get_process_method()
+    use_text_layer = get_use_text_layer()
+    formats = get_formats()
+    include_timings = get_include_timings()
+    render_profile = get_render_profile()
+    use_sse = "text/event-stream" in request.headers.get("Accept", "")
+
+    received, error = receive_pdf(file)
+    if error:
+        return error
+    temp_dir, pdf_path, _, page_numbers = received
+    filename = file.filename
+
+    def events():
+        export = None
+        try:
+            with track_request() as timings:
+                total_pages = count_pages(pdf_path) if page_numbers is None else len(page_numbers)
+                yield {"event": "start", "total_pages": total_pages, "action": action, "process_method": process_method}
+                export = start_export(filename, action, process_method, formats)
+                for page in iter_pipeline(pdf_path, action, process_method, use_text_layer, render_profile,
+                                          page_numbers):
+                    export.add_page(page)
+                    yield {"event": "page", "page": export.total_pages, "total_pages": total_pages, **page}
+                result = export.finish()
+                export = None
+                if include_timings:
+                    result["timings"] = timings.as_dict()
+            yield {"event": "done", **result}
+        except Exception as e:
+            yield {"event": "error", "error": str(e)}
+        finally:
+            if export:
+                export.abort()
+            release_upload_dir(temp_dir)
+
+    body = (encode_event(event, use_sse) for event in events())
+    return Response(
+        stream_with_context(body),
+        mimetype="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Job queue: uploads are processed by a bounded worker pool and polled by id
+JOB_WORKERS = int(os.environ.get("EDUAI_JOB_WORKERS", "2"))
+MAX_PENDING_JOBS = int(os.environ.get("EDUAI_MAX_PENDING_JOBS", "50"))
+JOB_RETENTION_SECONDS = int(os.environ.get("EDUAI_JOB_RETENTION_SECONDS", "3600"))
+
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="eduai-job")
+jobs = {}
+jobs_lock = threading.Lock()
+
+def prune_jobs():
+    cutoff = time.time() - JOB_RETENTION_SECONDS
+    with jobs_lock:
+        for job_id in [j for j, job in jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+            del jobs[job_id]
+
+def pending_jobs():
+    with jobs_lock:
+        return sum(1 for job in jobs.values() if job["status"] in ("queued", "running"))
+
+def run_job(job_id, temp_dir, work):
+    # work(progress) does the processing and returns the job result
+    job = jobs[job_id]
+    with jobs_lock:
+        job["status"] = "running"
+        job["started_at"] = time.time()
+
+    def progress(pages_done, total_pages):
+        with jobs_lock:
+            job["pages_done"] = pages_done
+            job["total_pages"] = total_pages
+
+    try:
+        result = work(progress)
+        with jobs_lock:
+            job["result"] = result
+            job["status"] = "done"
+    except Exception as e:
+        with jobs_lock:
+            job["error"] = str(e)
+            job["status"] = "error"
+    finally:
+        with jobs_lock:
+            job["finished_at"] = time.time()
+        release_upload_dir(temp_dir)
+
+def job_status(job):
+    status = {
+        "job_id": job["id"],
+        "status": job["status"],
+        "action": job["action"],
+        "process_method": job["process_method"],
+        "upload_filename": job["filename"],
+        "pages_done": job["pages_done"],
+        "total_pages": job["total_pages"],
+        "eta_seconds": None
+    }
+    if job["status"] == "running" and job["pages_done"] and job["total_pages"]:
+        elapsed = time.time() - job["started_at"]
+        remaining = job["total_pages"] - job["pages_done"]
+        status["eta_seconds"] = round(elapsed / job["pages_done"] * remaining, 1)
+    elif job["status"] == "done":
+        status["eta_seconds"] = 0
+        status.update(job["result"])
+    elif job["status"] == "error":
+        status["error"] = job["error"]
+    return status
+
+@app.route('/jobs/<action>', methods=['POST'])
+def submit_job(action):
+    error = validate_request(action)
+    if error:
+        return error
+    prune_jobs()
+    if pending_jobs() >= MAX_PENDING_JOBS:
+        return jsonify({'error': 'Too many pending jobs, try again later'}), 503
+
+    file = request.files['pdf']
+    received, error = receive_pdf(file)
+    if error:
+        return error
+    temp_dir, pdf_path, sha256, page_numbers = received
+
+    process_method = get_process_method()
+    options = {"use_text_layer": get_use_text_layer(), "formats": get_formats(),
+               "include_timings": get_include_timings(), "render_profile": get_render_profile(),
+               "page_numbers": page_numbers}
+    # The same file with the same options, submitted again while its job is still pending, joins that job
+    upload_key = (sha256, action, process_method, json.dumps(options, sort_keys=True))
+    duplicate = pending_job_for(upload_key)
+    if duplicate:
+        release_upload_dir(temp_dir)
+        return jsonify({"job_id": duplicate["id"], "status": duplicate["status"], "status_url": f"/jobs/{duplicate['id']}"}), 202
+
+    work = lambda progress: process_document(pdf_path, file.filename, action, process_method, progress, **options)
+    return queue_job(uuid.uuid4().hex, action, process_method, file.filename, temp_dir, work, upload_key)
+
+def pending_job_for(upload_key):
+    with jobs_lock:
+        for job in jobs.values():
+            if job["upload_key"] == upload_key and job["status"] in ("queued", "running"):
+                return job
+    return None
+
+def queue_job(job_id, action, process_method, filename, temp_dir, work, upload_key=None):
+    job = {
+        "id": job_id,
+        "status": "queued",
+        "action": action,
+        "process_method": process_method,
+        "filename": filename,
+        "pages_done": 0,
+        "total_pages": None,
+        "submitted_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "result": None,
+        "error": None,
+        "upload_key": upload_key
+    }
+    with jobs_lock:
+        jobs[job_id] = job
+    job_executor.submit(run_job, job_id, temp_dir, work)
+
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+
+# Batch endpoint: a zip archive or several PDFs, a list of actions, one downloadable bundle per file
+def get_actions():
+    actions = [a.strip().lower() for a in request.form.get("actions", "").split(",") if a.strip()]
+    return list(dict.fromkeys(actions))
+
+def run_batch_job(pdfs, actions, process_method, work_dir, options, progress):
+    output_dir = os.path.join(work_dir, "bundles")
+    os.makedirs(output_dir, exist_ok=True)
+    summary = run_batch(pdfs, actions, process_method, output_dir, progress=progress, **options)
+    for entry in summary:
+        bundle_dir = os.path.join(output_dir, entry["bundle"])
+        if entry["status"] == "done":
+            archive_path = shutil.make_archive(bundle_dir, "zip", bundle_dir)
+            archive_name = f"{entry['bundle']}_{file_sha256(archive_path)[:16]}.zip"
+            artifact_store.add(archive_name, archive_path)
+            entry["download_bundle"] = f"/downloads/{archive_name}"
+    return {"total_files": len(summary), "files": summary}
+
+@app.route('/batch', methods=['POST'])
+def submit_batch():
+    actions = get_actions()
+    if not actions or any(action not in allowed_actions for action in actions):
+        return jsonify({'error': f'Invalid actions. Allowed: {allowed_actions}'}), 400
+    archive = request.files.get('archive')
+    uploads = [f for f in request.files.getlist('pdf') if f.filename.lower().endswith('.pdf')]
+    if archive is None and not uploads:
+        return jsonify({'error': 'Upload a zip archive as "archive" or PDF files as "pdf"'}), 400
+    prune_jobs()
+    if pending_jobs() >= MAX_PENDING_JOBS:
+        return jsonify({'error': 'Too many pending jobs, try again later'}), 503
+
+    temp_dir = new_upload_dir()
+    try:
+        if archive is not None:
+            archive_path = os.path.join(temp_dir, "upload.zip")
+            save_upload(archive, archive_path)
+        else:
+            pdfs = []
+            for n, upload in enumerate(uploads):
+                path = os.path.join(temp_dir, f"{n}_{secure_filename(upload.filename)}")
+                save_upload(upload, path)
+                pdfs.append((upload.filename, path))
+    except OSError as e:
+        release_upload_dir(temp_dir)
+        return jsonify({'error': f'The upload could not be saved: {e}'}), 500
+    try:
+        if archive is not None:
+            if not zipfile.is_zipfile(archive_path):
+                raise ValueError("The archive is not a zip file")
+            pdfs = collect_pdfs(archive_path, temp_dir)
+        if not pdfs:
+            raise ValueError("No PDF files found in the upload")
+    except ValueError as e:
+        release_upload_dir(temp_dir)
+        return jsonify({'error': str(e)}), 400
+    except (zipfile.BadZipFile, EOFError, OSError) as e:
+        # Truncated or corrupt archives fail while members are read
+        release_upload_dir(temp_dir)
+        return jsonify({'error': f'The archive could not be read: {e}'}), 400
+
+    process_method = get_process_method()
+    options = {"formats": get_formats(), "use_text_layer": get_use_text_layer(), "render_profile": get_render_profile()}
+    filename = archive.filename if archive is not None else f"{len(pdfs)} files"
+    job_id = uuid.uuid4().hex
+    work = lambda progress: run_batch_job(pdfs, actions, process_method, temp_dir, options, progress)
+    return queue_job(job_id, ",".join(actions), process_method, filename, temp_dir, work)
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is None:
+            return jsonify({'error': 'Unknown job id'}), 404
+        return jsonify(job_status(job))
+
+# Cache statistics for operators
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify({**result_cache.stats(), "downloads": artifact_store.stats()})
+
+# Liveness and readiness. Rule-based processing is ready as soon as the app serves, AI processing once torch,
+# transformers and EasyOCR are imported and the models in EDUAI_PRELOAD_MODELS are loaded
+def engine_status():
+    loaded = model_registry.status()["loaded"]
+    return {
+        "rule": True,
+        "ai": heavy_imports.is_ready(*heavy_imports.names) and all(name in loaded for name in PRELOAD_MODELS if name in model_registry.loaders)
+    }
+
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({"status": "ok", "startup_mode": STARTUP_MODE, "uptime_seconds": round(time.time() - STARTED_AT, 1)})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    # ?engine=ai makes the probe wait for the AI engine, the default only needs rule-based processing
+    engine = request.args.get("engine", "rule").lower()
+    engines = engine_status()
+    if engine not in engines:
+        return jsonify({'error': f'Unknown engine. Available: {list(engines)}'}), 400
+    status = {
+        "ready": engines[engine],
+        "engine": engine,
+        "engines": engines,
+        "imports": heavy_imports.status(),
+        "models_loaded": list(model_registry.status()["loaded"])
+    }
+    return jsonify(status), 200 if status["ready"] else 503
+
+# Model registry: status and warm-up
+@app.route('/models', methods=['GET'])
+def models_status():
+    return jsonify(model_registry.status())
+
+@app.route('/models/warmup', methods=['POST'])
+def warmup_models():
+    data = request.get_json(silent=True) or {}
+    names = data.get("models") or list(model_registry.loaders)
+    unknown = [name for name in names if name not in model_registry.loaders]
+    if unknown:
+        return jsonify({'error': f'Unknown models: {unknown}. Available: {list(model_registry.loaders)}'}), 400
+    return jsonify({"warmed": model_registry.warm(names), **model_registry.status()})
+
+# Prometheus metrics: stage timings and page latency come from the pipeline, the rest is read at scrape time
+def job_counts():
+    with jobs_lock:
+        counts = {(("status", status),): 0 for status in ("queued", "running", "done", "error")}
+        for job in jobs.values():
+            counts[(("status", job["status"]),)] += 1
+    return counts
+
+def cache_counter(field):
+    stats = result_cache.stats()
+    return {(("kind", kind),): value for kind, value in stats[field].items()}
+
+def loaded_model_bytes():
+    with model_registry.lock:
+        return {(("model", name),): size for name, size in model_registry.sizes.items()}
+
+register(Gauge("eduai_jobs", "Background jobs by status, queued is the queue depth", job_counts))
+register(Gauge("eduai_cache_hits_total", "Result cache hits", lambda: cache_counter("hits"), kind="counter"))
+register(Gauge("eduai_cache_misses_total", "Result cache misses", lambda: cache_counter("misses"), kind="counter"))
+register(Gauge("eduai_cache_size_bytes", "Result cache size on disk", lambda: {(): result_cache.stats()["size_bytes"]}))
+register(Gauge("eduai_downloads_size_bytes", "Download folder size on disk",
+               lambda: {(): artifact_store.stats()["size_bytes"]}))
+register(Gauge("eduai_model_bytes", "Estimated memory of loaded models", loaded_model_bytes))
+register(Gauge("eduai_inference_pending", "Items waiting in the inference scheduler", inference_scheduler.pending))
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(render(), mimetype="text/plain; version=0.0.4")
 
 # Download route
 @app.route('/downloads/<filename>')
 def download(filename):
-    return send_from_directory(DOWNLOAD_DIR, filename, as_attachment=True)
+    # Only names known to the store are served, send_from_directory still refuses paths outside the folder
+    if artifact_store.locate(filename) is None:
+        return jsonify({'error': 'Download not found or expired, process the document again'}), 404
+    return send_from_directory(artifact_store.directory, filename, as_attachment=True)
 
 # Run the app
 if __name__ == '__main__':
+    start_services()
     app.run(host='0.0.0.0', port=5000, debug=True)
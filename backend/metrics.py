@@ -0,0 +1,165 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# In-process metrics rendered in the Prometheus text format, no client library needed
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{escape(value)}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, value=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, key, value) for key, value in self.values.items()]
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, description, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, (counts, total) in self.values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", key + (("le", format_value(bound)),), cumulative))
+                samples.append((f"{self.name}_sum", key, total))
+                samples.append((f"{self.name}_count", key, cumulative))
+        return samples
+
+class Gauge:
+    # Read at scrape time from a callback returning {labels tuple: value}, kind "counter" for totals kept elsewhere
+    def __init__(self, name, description, read, kind="gauge"):
+        self.name = name
+        self.description = description
+        self.read = read
+        self.kind = kind
+
+    def samples(self):
+        return [(self.name, key, value) for key, value in self.read().items()]
+
+metrics = []
+
+def register(metric):
+    metrics.append(metric)
+    return metric
+
+def render():
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+STAGE_SECONDS = register(Histogram("eduai_stage_seconds", "Wall time per pipeline stage call, excluding nested stages"))
+PAGE_SECONDS = register(Histogram("eduai_page_seconds", "Per-page processing latency"))
+PAGES = register(Counter("eduai_pages_total", "Pages processed"))
+GENERATED_TOKENS = register(Counter("eduai_generated_tokens_total", "Tokens generated by the seq2seq models"))
+
+# Stage timers nest: time spent in an inner stage (rasterizing while OCR pulls pages) is only counted once
+local = threading.local()
+
+class RequestTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.tokens_generated = 0
+        self.lock = threading.Lock()
+
+    def add_stage(self, stage, seconds):
+        with self.lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_tokens(self, count):
+        with self.lock:
+            self.tokens_generated += count
+
+    def as_dict(self):
+        with self.lock:
+            timings = {stage: round(seconds, 4) for stage, seconds in self.stages.items()}
+        timings["total"] = round(time.perf_counter() - self.started, 4)
+        timings["tokens_generated"] = self.tokens_generated
+        return timings
+
+def current_timings():
+    return getattr(local, "timings", None)
+
+@contextmanager
+def use_timings(timings):
+    # Lets worker threads of a request add to that request's timings
+    previous = current_timings()
+    local.timings = timings
+    try:
+        yield timings
+    finally:
+        local.timings = previous
+
+def track_request():
+    return use_timings(RequestTimings())
+
+@contextmanager
+def stage_timer(stage):
+    stack = local.__dict__.setdefault("stack", [])
+    frame = [0.0]
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        if stack:
+            stack[-1][0] += elapsed
+        own = elapsed - frame[0]
+        STAGE_SECONDS.observe(own, stage=stage)
+        timings = current_timings()
+        if timings:
+            timings.add_stage(stage, own)
+
+def count_tokens(count):
+    GENERATED_TOKENS.inc(count)
+    timings = current_timings()
+    if timings:
+        timings.add_tokens(count)
@@ -0,0 +1,107 @@
+import os
+import threading
+from collections import OrderedDict
+from metrics import stage_timer
+
+# Models are loaded on first use and the least recently used ones are dropped past the budget
+MODEL_MEMORY_BUDGET_BYTES = int(os.environ.get("EDUAI_MODEL_MEMORY_MB", "6144")) * 1024 * 1024
+
+def tensor_bytes(value):
+    if isinstance(value, (tuple, list)):
+        return sum(tensor_bytes(item) for item in value)
+    if hasattr(value, "numel") and hasattr(value, "element_size"):
+        return value.numel() * value.element_size()
+    return 0
+
+def estimate_bytes(obj):
+    # Sums parameters and buffers of every torch module reachable from a loaded entry
+    if obj is None:
+        return 0
+    if isinstance(obj, dict):
+        return sum(estimate_bytes(value) for value in obj.values())
+    if hasattr(obj, "parameters") and hasattr(obj, "buffers"):
+        tensors = list(obj.parameters()) + list(obj.buffers())
+        size = sum(t.numel() * t.element_size() for t in tensors)
+        # Dynamically quantized Linear layers keep their int8 weight and bias in packed params, outside parameters()
+        if hasattr(obj, "state_dict"):
+            size += sum(tensor_bytes(value) for key, value in obj.state_dict().items()
+                        if key.endswith("_packed_params._packed_params"))
+        return size
+    # Pipelines keep their network in .model, EasyOCR readers in .detector and .recognizer
+    return sum(estimate_bytes(getattr(obj, attr, None)) for attr in ("model", "detector", "recognizer"))
+
+class ModelRegistry:
+    def __init__(self, memory_budget_bytes=MODEL_MEMORY_BUDGET_BYTES):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.loaders = {}
+        self.loaded = OrderedDict()
+        self.sizes = {}
+        self.lock = threading.Lock()
+        self.load_locks = {}
+        # Models whose loader found nothing, not retried on every page until warmed up or re-registered
+        self.missing = set()
+
+    def register(self, name, loader):
+        self.loaders[name] = loader
+        self.load_locks[name] = threading.Lock()
+        self.missing.discard(name)
+
+    def get(self, name):
+        with self.lock:
+            if name in self.missing:
+                return None
+            if name in self.loaded:
+                self.loaded.move_to_end(name)
+                return self.loaded[name]
+
+        # One loader per model, concurrent callers wait for it instead of loading twice
+        with self.load_locks[name]:
+            with self.lock:
+                if name in self.missing:
+                    return None
+                if name in self.loaded:
+                    self.loaded.move_to_end(name)
+                    return self.loaded[name]
+            with stage_timer("model_load"):
+                model = self.loaders[name]()
+            if model is None:
+                with self.lock:
+                    self.missing.add(name)
+                return None
+            size = estimate_bytes(model)
+            with self.lock:
+                self.loaded[name] = model
+                self.sizes[name] = size
+                self.evict(keep=name)
+            return model
+
+    def evict(self, keep=None):
+        # Callers that still hold a dropped model keep it alive until they finish
+        while sum(self.sizes.values()) > self.memory_budget_bytes:
+            victim = next((name for name in self.loaded if name != keep), None)
+            if victim is None:
+                break
+            print(f"♻️ Unloading {victim} model to stay within the memory budget.")
+            del self.loaded[victim]
+            del self.sizes[victim]
+
+    def warm(self, names):
+        # Warm-up retries missing models, e.g. after they were downloaded
+        with self.lock:
+            self.missing.difference_update(names)
+        return {name: self.get(name) is not None for name in names}
+
+    def unload(self, name):
+        with self.lock:
+            self.loaded.pop(name, None)
+            self.sizes.pop(name, None)
+
+    def status(self):
+        with self.lock:
+            return {
+                "registered": list(self.loaders),
+                "loaded": {name: self.sizes[name] for name in self.loaded},
+                "missing": sorted(self.missing),
+                "used_bytes": sum(self.sizes.values()),
+                "budget_bytes": self.memory_budget_bytes
+            }
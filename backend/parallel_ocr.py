@@ -0,0 +1,49 @@
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+import pytesseract
+from render_profiles import binarize_image
+
+# Tesseract (configured here so that pool worker processes pick it up too)
+pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe" # Adjust path as needed
+os.environ["TESSDATA_PREFIX"] = r"C:\Program Files\Tesseract-OCR\tessdata"
+
+# Number of OCR processes, 1 runs Tesseract in the calling process
+OCR_WORKERS = int(os.environ.get("EDUAI_OCR_WORKERS", os.cpu_count() or 1))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def pixmap_to_image(pix):
+    mode = "L" if pix.n == 1 else "RGB"
+    return Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+def tesseract_ocr(image, binarize=False):
+    if binarize:
+        image = binarize_image(image)
+    return pytesseract.image_to_string(image, lang="fra")
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+        return _pool
+
+def iter_tesseract_ocr(images, binarize=False):
+    if OCR_WORKERS <= 1:
+        for image in images:
+            yield tesseract_ocr(image, binarize)
+        return
+
+    # Keep a bounded window of pages in flight and hand texts back in page order
+    pool = get_pool()
+    pending = deque()
+    for image in images:
+        pending.append(pool.submit(tesseract_ocr, image, binarize))
+        if len(pending) >= OCR_WORKERS * 2:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
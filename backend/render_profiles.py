@@ -0,0 +1,44 @@
+import os
+import fitz
+import numpy as np
+from PIL import Image
+
+# Render profiles trade OCR latency for accuracy: resolution, colour and clean-up before OCR
+RENDER_PROFILES = {
+    "fast": {"dpi": 100, "grayscale": True, "max_side": 1280, "binarize": False},
+    "balanced": {"dpi": 150, "grayscale": True, "max_side": 2000, "binarize": False},
+    "accurate": {"dpi": 300, "grayscale": True, "max_side": None, "binarize": True},
+}
+DEFAULT_RENDER_PROFILE = os.environ.get("EDUAI_RENDER_PROFILE", "balanced")
+if DEFAULT_RENDER_PROFILE not in RENDER_PROFILES:
+    DEFAULT_RENDER_PROFILE = "balanced"
+
+# EasyOCR resizes every image to fit this canvas before detection
+EASYOCR_CANVAS_SIZE = 2560
+
+def render_settings(profile, process_method):
+    settings = dict(RENDER_PROFILES[profile])
+    if process_method == "ai":
+        # Pixels past EasyOCR's canvas are thrown away, and its detector works better on grey levels than on a threshold
+        settings["max_side"] = min(settings["max_side"] or EASYOCR_CANVAS_SIZE, EASYOCR_CANVAS_SIZE)
+        settings["binarize"] = False
+    return settings
+
+def render_page(page, settings):
+    # Downscaling happens in the renderer, so oversized pages are never rasterized at full size
+    zoom = settings["dpi"] / 72
+    if settings["max_side"]:
+        zoom = min(zoom, settings["max_side"] / max(page.rect.width, page.rect.height))
+    colorspace = fitz.csGRAY if settings["grayscale"] else fitz.csRGB
+    return page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=colorspace, alpha=False)
+
+def binarize_image(image):
+    # Otsu threshold: the grey level that best separates ink from background
+    gray = np.asarray(image.convert("L"))
+    prob = np.bincount(gray.ravel(), minlength=256) / gray.size
+    omega = np.cumsum(prob)
+    mu = np.cumsum(prob * np.arange(256))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        between = (mu[-1] * omega - mu) ** 2 / (omega * (1 - omega))
+    threshold = int(np.nanargmax(between)) if np.isfinite(between).any() else 127
+    return Image.fromarray(np.where(gray > threshold, 255, 0).astype(np.uint8))
@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Persistent cache for raw OCR text and per-action page outputs
+CACHE_DIR = os.path.abspath(os.environ.get("EDUAI_CACHE_DIR", "cache"))
+CACHE_MAX_BYTES = int(os.environ.get("EDUAI_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResultCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(cache_dir, "results.sqlite3"), check_same_thread=False)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "kind TEXT, key TEXT, value TEXT, size INTEGER, last_used REAL, "
+            "PRIMARY KEY (kind, key))"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.db.commit()
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+
+    def get(self, kind, key):
+        with self.lock:
+            row = self.db.execute("SELECT value FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if row is None:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+                return None
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+            self.db.execute("UPDATE entries SET last_used = ? WHERE kind = ? AND key = ?", (time.time(), kind, key))
+            self.db.commit()
+            return json.loads(row[0])
+
+    def put(self, kind, key, value):
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.db.execute("SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                (kind, key, data, size, time.time())
+            )
+            self.total_bytes += size
+            self.evict()
+            self.db.commit()
+
+    def evict(self):
+        # Drop least recently used entries until the cache fits its budget again
+        while self.total_bytes > self.max_bytes:
+            rows = self.db.execute("SELECT kind, key, size FROM entries ORDER BY last_used LIMIT 64").fetchall()
+            if not rows:
+                break
+            for kind, key, size in rows:
+                self.db.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                self.total_bytes -= size
+                self.evictions += 1
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def stats(self):
+        with self.lock:
+            entries = self.db.execute("SELECT kind, COUNT(*) FROM entries GROUP BY kind").fetchall()
+            kinds = set(self.hits) | set(self.misses) | {kind for kind, _ in entries}
+            return {
+                "size_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "entries": dict(entries),
+                "hits": {kind: self.hits.get(kind, 0) for kind in kinds},
+                "misses": {kind: self.misses.get(kind, 0) for kind in kinds}
+            }
@@ -0,0 +1,113 @@
+import os
+import queue
+import threading
+from metrics import current_timings, stage_timer, use_timings
+
+# Stages run on background threads and hand items on through bounded queues: a slow stage
+# blocks the ones before it instead of letting work pile up in memory
+STAGE_QUEUE_SIZE = int(os.environ.get("EDUAI_STAGE_QUEUE_SIZE", "4"))
+NLP_WORKERS = int(os.environ.get("EDUAI_NLP_WORKERS", "1"))
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+def stopped(events):
+    return any(event.is_set() for event in events)
+
+def put(q, item, events):
+    while not stopped(events):
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def get(q, events):
+    while not stopped(events):
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            pass
+    return None
+
+def run_stage(source, fn=None, workers=1, queue_size=STAGE_QUEUE_SIZE, name="eduai-stage", cancel=None):
+    # Without fn the source iterator itself runs in the background (for generators that keep state),
+    # with fn up to `workers` threads apply it; results always come back in source order.
+    # Nested stages can share one cancel event: it is set when any of them is closed before its end or fails,
+    # and every stage (and a source that checks it between pages) stops at its next step instead of finishing
+    # its item. A stage its caller may close once it has what it needs should not be given the shared event
+    timings = current_timings()
+    cancel = cancel or threading.Event()
+    stop = threading.Event()
+    events = (stop, cancel)
+    out_q = queue.Queue(queue_size)
+    in_q = queue.Queue(queue_size) if fn else None
+    threads = []
+
+    def feed():
+        with use_timings(timings):
+            try:
+                for seq, item in enumerate(source):
+                    if not put(in_q or out_q, (seq, item, None), events):
+                        return
+                for _ in range(workers if fn else 1):
+                    put(in_q or out_q, (None, _END, None), events)
+            except BaseException as e:
+                put(out_q, (None, None, e), events)
+            finally:
+                if hasattr(source, "close"):
+                    source.close()
+
+    def work():
+        with use_timings(timings):
+            while True:
+                task = get(in_q, events)
+                if task is None:
+                    return
+                seq, item, _ = task
+                if item is _END:
+                    put(out_q, task, events)
+                    return
+                try:
+                    result = fn(item)
+                except BaseException as e:
+                    put(out_q, (seq, None, e), events)
+                    return
+                if not put(out_q, (seq, result, None), events):
+                    return
+
+    threads.append(threading.Thread(target=feed, name=f"{name}-feed", daemon=True))
+    if fn:
+        threads.extend(threading.Thread(target=work, name=f"{name}-{n}", daemon=True) for n in range(workers))
+    for thread in threads:
+        thread.start()
+
+    finished = False
+    try:
+        pending = {}
+        next_seq = 0
+        ended = 0
+        while ended < (workers if fn else 1):
+            # Time spent waiting on the previous stage is kept out of the caller's own stage
+            with stage_timer("queue_wait"):
+                task = get(out_q, events)
+            if task is None:
+                return
+            seq, item, error = task
+            if error is not None:
+                raise error
+            if item is _END:
+                ended += 1
+                continue
+            pending[seq] = item
+            while next_seq in pending:
+                yield pending.pop(next_seq)
+                next_seq += 1
+        finished = True
+    finally:
+        if not finished:
+            cancel.set()
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,30 @@
+import os
+
+# Opt-in CPU inference tuning for the transformer models.
+# torch is imported inside the functions so importing this module stays cheap, see deferred_imports.py
+QUANTIZE_MODELS = os.environ.get("EDUAI_QUANTIZE", "0").lower() in ["1", "true", "yes"]
+TORCH_THREADS = int(os.environ.get("EDUAI_TORCH_THREADS", "0"))
+TORCH_INTEROP_THREADS = int(os.environ.get("EDUAI_TORCH_INTEROP_THREADS", "0"))
+
+def configure_threads(threads=TORCH_THREADS, interop_threads=TORCH_INTEROP_THREADS):
+    # 0 keeps torch's own defaults
+    import torch
+    if threads:
+        torch.set_num_threads(threads)
+    if interop_threads:
+        try:
+            torch.set_num_interop_threads(interop_threads)
+        except RuntimeError:
+            # Only allowed before the first inter-op parallel work has started
+            print("❌ Inter-op thread count must be set before torch starts any parallel work.")
+
+def quantize_model(model):
+    # Dynamic int8 quantization of Linear layers, weights are quantized once and activations on the fly
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def prepare_model(model, quantize=QUANTIZE_MODELS):
+    model.eval()
+    if quantize:
+        model = quantize_model(model)
+    return model
@@ -0,0 +1,97 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from flask import Request
+from result_cache import file_sha256
+
+# Uploads are streamed to disk as the request body arrives, hashed on the way, and moved into place without a
+# second copy. Each request's files live under their own temp root so leftovers from crashed or killed
+# requests can be found and removed
+UPLOAD_DIR = os.path.abspath(os.environ.get("EDUAI_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "eduai-uploads")))
+UPLOAD_TTL_SECONDS = float(os.environ.get("EDUAI_UPLOAD_TTL_HOURS", "6")) * 3600
+# Enforced by Flask as MAX_CONTENT_LENGTH: rejected up front from Content-Length, or as soon as a chunked body
+# goes over it
+MAX_UPLOAD_BYTES = int(os.environ.get("EDUAI_MAX_UPLOAD_MB", "200")) * 1024 * 1024
+
+active_uploads = set()
+uploads_lock = threading.Lock()
+
+def new_upload_dir():
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = tempfile.mkdtemp(dir=UPLOAD_DIR)
+    with uploads_lock:
+        active_uploads.add(path)
+    return path
+
+def release_upload_dir(path):
+    shutil.rmtree(path, ignore_errors=True)
+    with uploads_lock:
+        active_uploads.discard(path)
+
+def cleanup_uploads(max_age=UPLOAD_TTL_SECONDS):
+    # Directories still in use are skipped however old they are
+    if not os.path.isdir(UPLOAD_DIR):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    with uploads_lock:
+        in_use = set(active_uploads)
+    for entry in os.scandir(UPLOAD_DIR):
+        if entry.path in in_use:
+            continue
+        try:
+            if entry.stat().st_mtime < cutoff:
+                if entry.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+class UploadStream:
+    # Werkzeug writes every multipart chunk of a file here as it is parsed: straight to disk, hashed on the way
+    def __init__(self):
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".upload")
+        self.file = os.fdopen(fd, 'w+b')
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        self.digest.update(data)
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+    def sha256(self):
+        return self.digest.hexdigest()
+
+    def move_to(self, path):
+        # Windows cannot rename a file that is still open
+        self.file.close()
+        os.replace(self.path, path)
+        self.path = None
+
+    def close(self):
+        self.file.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return UploadStream()
+
+def save_upload(file, path):
+    # Moves an uploaded file to path and returns its sha256
+    if isinstance(file.stream, UploadStream):
+        file.stream.move_to(path)
+        return file.stream.sha256()
+    file.save(path)
+    return file_sha256(path)
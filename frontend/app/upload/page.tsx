@@ -10,6 +10,7 @@ const Upload = () => {
   const [uploadedFiles, setUploadedFiles] = useState<File[]>([]);
   const [isProcessing, setIsProcessing] = useState(false);
   const [result, setResult] = useState<any>(null);
+  const [progress, setProgress] = useState<{ done: number; total: number } | null>(null);
   const [isDragOver, setIsDragOver] = useState(false);
   const fileInputRef = useRef<HTMLInputElement | null>(null);
   const [processMethod, setProcessMethod] = useState<'ai' | 'rule'>('ai');
@@ -53,6 +54,8 @@ const Upload = () => {
     if (uploadedFiles.length === 0) return;
 
     setIsProcessing(true);
+    setResult(null);
+    setProgress(null);
     const formData = new FormData();
     formData.append("pdf", uploadedFiles[0]);
     formData.append("process_method", processMethod); // Add processing method
@@ -65,21 +68,50 @@ const Upload = () => {
         translation: "translate",
       };
 
+      // Streaming endpoint: one JSON event per line, pages arrive as soon as they are processed
       const response = await fetch(
-        `http://localhost:5000/${actionMap[selectedFunction]}`,
+        `http://localhost:5000/${actionMap[selectedFunction]}/stream`,
         {
           method: "POST",
           body: formData,
         }
       );
 
-      if (!response.ok) {
+      if (!response.ok || !response.body) {
         const errText = await response.text();
         throw new Error(`Processing failed: ${errText}`);
       }
 
-      const data = await response.json();
-      setResult(data);
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+
+      const handleEvent = (event: any) => {
+        if (event.event === "start") {
+          setProgress({ done: 0, total: event.total_pages });
+        } else if (event.event === "page") {
+          setProgress({ done: event.page, total: event.total_pages });
+          if (event.page === 1) {
+            setResult({ page1: event.output, total_pages: event.total_pages });
+          }
+        } else if (event.event === "done") {
+          setResult(event);
+        } else if (event.event === "error") {
+          throw new Error(`Processing failed: ${event.error}`);
+        }
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop() ?? "";
+        for (const line of lines) {
+          if (line.trim()) handleEvent(JSON.parse(line));
+        }
+      }
+      if (buffer.trim()) handleEvent(JSON.parse(buffer));
     } catch (err: any) {
       console.error("Error:", err);
       alert("Error: " + err.message);
@@ -196,13 +228,18 @@ const Upload = () => {
                 <CardTitle>Output</CardTitle>
               </CardHeader>
               <CardContent>
-                {isProcessing ? (
+                {isProcessing && !result ? (
                   <div className="text-center py-12 text-gray-500">
                     <Zap className="h-12 w-12 mx-auto mb-4 animate-spin" />
                     <p>Processing {uploadedFiles[0]?.name}...</p>
                   </div>
                 ) : result ? (
                   <div>
+                    {isProcessing && progress && (
+                      <p className="mb-4 text-sm text-gray-500">
+                        Processed {progress.done} of {progress.total} pages...
+                      </p>
+                    )}
                     <div className="mb-6 p-4 border rounded-lg bg-white">
                       <h3 className="font-bold mb-2">
                         Page 1 of {result.total_pages}